@@ -0,0 +1,123 @@
+# Stochastic traffic demand. Every approach of every intersection is an
+# independent Poisson arrival stream, turn ratios pick the movement (each
+# row is one origin of the origin-destination matrix), and ambulances are
+# a separate dispatch stream. Whole schedules are drawn at once with NumPy
+# from a seed, so the same seed always gives the same traffic.
+import json
+
+import numpy as np
+
+APPROACHES = ("N", "E", "S", "W")
+TURNS = ("straight", "left", "right")
+VEHICLE_TYPES = ("car", "ambulance")
+SPEEDS = {"car": 3, "ambulance": 2}     # same as the window's spawn buttons
+
+# The window runs at 60 ticks per second; rates are given per minute
+TICKS_PER_MINUTE = 60 * 60
+
+DEFAULT_APPROACH_RATES = {"N": 4.0, "E": 4.0, "S": 4.0, "W": 4.0}
+DEFAULT_TURN_RATIOS = {"straight": 0.6, "left": 0.2, "right": 0.2}
+DEFAULT_AMBULANCE_RATE = 0.1
+
+
+class SpawnSchedule:
+    """Timed spawns as parallel arrays, sorted by tick."""
+
+    def __init__(self, ticks, route_index, type_index, route_ids):
+        self.ticks = ticks
+        self.route_index = route_index      # into route_ids
+        self.type_index = type_index        # into VEHICLE_TYPES
+        self.route_ids = route_ids
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def count(self, vehicle_type):
+        return int(np.count_nonzero(self.type_index == VEHICLE_TYPES.index(vehicle_type)))
+
+    def records(self):
+        """One dict per spawn, in the JSONL scenario format."""
+        route_ids = self.route_ids
+        for tick, route, kind in zip(self.ticks.tolist(), self.route_index.tolist(), self.type_index.tolist()):
+            vehicle_type = VEHICLE_TYPES[kind]
+            yield {"tick": tick, "type": vehicle_type, "route": route_ids[route], "speed": SPEEDS[vehicle_type]}
+
+    def spawns(self, routes, route_lights):
+        """Feed for Simulation.set_spawns; routes and route_lights map route id -> Route / TrafficLight."""
+        for v in self.records():
+            route_id = v["route"]
+            yield v["tick"], routes[route_id], v["speed"], v["type"], route_lights[route_id]
+
+    def write_jsonl(self, path):
+        with open(path, "w") as f:
+            for v in self.records():
+                f.write(json.dumps(v) + "\n")
+
+
+class DemandModel:
+    def __init__(self, approach_rates=None, turn_ratios=None, ambulance_rate=DEFAULT_AMBULANCE_RATE,
+                 intersections=("",)):
+        """Arrival rates are vehicles per minute.
+
+        approach_rates: approach -> rate. turn_ratios: turn -> share, or
+        approach -> {turn: share} for a full origin-destination table.
+        ambulance_rate: dispatches per minute per intersection.
+        intersections: route id prefix of each intersection ("" for the
+        single intersection, "row,col:" for a GridNetwork).
+        """
+        approach_rates = DEFAULT_APPROACH_RATES if approach_rates is None else approach_rates
+        turn_ratios = DEFAULT_TURN_RATIOS if turn_ratios is None else turn_ratios
+        if all(approach in turn_ratios for approach in APPROACHES):
+            rows = [turn_ratios[approach] for approach in APPROACHES]
+        else:
+            rows = [turn_ratios] * len(APPROACHES)
+
+        shares = np.array([[row.get(turn, 0.0) for turn in TURNS] for row in rows], dtype=float)
+        totals = shares.sum(axis=1, keepdims=True)
+        if np.any(totals <= 0):
+            raise ValueError("Every approach needs a positive turn ratio")
+        self.turn_cdf = np.cumsum(shares / totals, axis=1)      # (approach, turn)
+
+        self.approach_rates = np.array([approach_rates.get(a, 0.0) for a in APPROACHES], dtype=float)
+        self.ambulance_rate = ambulance_rate
+        self.intersections = list(intersections)
+        # route number = (intersection * 4 + approach) * 3 + turn
+        self.route_ids = [
+            f"{prefix}{approach}_{turn}"
+            for prefix in self.intersections for approach in APPROACHES for turn in TURNS
+        ]
+
+    def generate(self, ticks, seed=None):
+        """SpawnSchedule for ticks ticks of traffic drawn from seed."""
+        rng = np.random.default_rng(seed)
+        count = len(self.intersections)
+        streams = count * len(APPROACHES)
+
+        # A Poisson process with n arrivals in [0, ticks) has them uniformly
+        # placed, the same as summing exponential gaps but in one draw
+        car_counts = rng.poisson(np.tile(self.approach_rates, count) * ticks / TICKS_PER_MINUTE)
+        car_stream = np.repeat(np.arange(streams), car_counts)
+
+        # Ambulances come from the approaches in proportion to their traffic
+        ambulance_counts = rng.poisson(self.ambulance_rate * ticks / TICKS_PER_MINUTE, size=count)
+        total_rate = self.approach_rates.sum()
+        weights = self.approach_rates / total_rate if total_rate > 0 else None
+        ambulance_origin = rng.choice(len(APPROACHES), size=int(ambulance_counts.sum()), p=weights)
+        ambulance_stream = np.repeat(np.arange(count), ambulance_counts) * len(APPROACHES) + ambulance_origin
+
+        stream = np.concatenate([car_stream, ambulance_stream])
+        type_index = np.concatenate([
+            np.zeros(len(car_stream), dtype=np.int8),
+            np.ones(len(ambulance_stream), dtype=np.int8),
+        ])
+        arrival = np.floor(rng.uniform(0, ticks, size=len(stream))).astype(np.int64)
+
+        # Pick each arrival's movement from its approach's row of the table
+        approach = stream % len(APPROACHES)
+        draw = rng.random(len(stream))
+        turn = (draw[:, None] >= self.turn_cdf[approach]).sum(axis=1)
+        np.minimum(turn, len(TURNS) - 1, out=turn)
+        route_index = stream * len(TURNS) + turn
+
+        order = np.argsort(arrival, kind="stable")
+        return SpawnSchedule(arrival[order], route_index[order], type_index[order], self.route_ids)
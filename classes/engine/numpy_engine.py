@@ -0,0 +1,458 @@
+# Optional vectorized simulation core. All vehicle state lives in NumPy
+# arrays (struct of arrays) and every tick is advanced with batched array
+# operations instead of one Vehicle.update call per vehicle. Vehicle objects
+# are kept only as views for rendering and are refreshed by sync_views(),
+# which only does work when a step has run since the last sync.
+import numpy as np
+
+from classes.traffic_light.light_state import LightState
+from classes.graph.lane_occupancy import find_shared_edges
+from classes.vehicle_profile import get_profile
+from classes.vehicle import (
+    AMBULANCE_ZONE_RADIUS,
+    TRAFFIC_ZONE_RADIUS,
+    ZONE_CENTER_X,
+    ZONE_CENTER_Y,
+    opposing_routes,
+)
+
+# same spacing rules as Vehicle; the gaps and speeds come from each vehicle's profile
+GAP_BUFFER = 5
+LEFT_TURN_APPROACH_DISTANCE = 100   # start holding for the wait point this close to it
+STOP_OFFSET = 5                     # stop this far before the stop node
+RED_HOLD_DISTANCE = 80              # a red light holds vehicles this close to the stop line
+RED_STOPPED_DISTANCE = 10           # and those this close stay where they are
+
+RED_STATES = (LightState.NS_RED, LightState.EW_RED)
+
+
+class RouteTable:
+    """All route paths packed into flat arrays, indexed by route number."""
+
+    def __init__(self, routes, shared_edges=()):
+        self.names = list(routes.keys())
+        self.index = {name: i for i, name in enumerate(self.names)}
+        route_list = [routes[name] for name in self.names]
+        count = len(route_list)
+
+        # Global edge numbering, shared by every route that uses an edge
+        edge_ids = {}
+        for route in route_list:
+            for edge in route.edges:
+                edge_ids.setdefault(edge, len(edge_ids))
+        # per edge: whether it branches or merges (see LaneOccupancy), and the
+        # node it starts at, so the edges leaving one node can be grouped
+        node_ids = {}
+        self.edge_shared = np.array([edge in shared_edges for edge in edge_ids], dtype=bool)
+        self.edge_start_node = np.array(
+            [node_ids.setdefault(edge.start.id, len(node_ids)) for edge in edge_ids], dtype=np.int64
+        )
+        self.node_count = len(node_ids)
+
+        max_edges = max(len(route.edges) for route in route_list)
+        self.edge_id = np.full((count, max_edges + 1), -1, dtype=np.int64)
+        self.edge_start = np.full((count, max_edges + 1), np.inf)
+        self.edge_end = np.zeros((count, max_edges))
+
+        self.total_length = np.zeros(count)
+        self.stop_dist = np.full(count, np.inf)
+        self.wait_dist = np.full(count, np.inf)
+        self.is_left = np.zeros(count, dtype=bool)
+        self.opposing = np.zeros((count, count), dtype=bool)
+
+        points, keys, angles, directions = [], [], [], []
+        self.base = np.zeros(count)
+        self.first_point = np.zeros(count, dtype=np.int64)
+        self.last_segment = np.zeros(count, dtype=np.int64)
+        base = 0.0
+        offset = 0
+
+        for r, route in enumerate(route_list):
+            pts = np.array([(p.x, p.y) for p in route.path], dtype=float)
+            cum = np.array(route.cum_lengths)
+
+            self.total_length[r] = cum[-1]
+            self.base[r] = base
+            self.first_point[r] = offset
+            self.last_segment[r] = offset + len(pts) - 2
+
+            points.append(pts)
+            keys.append(base + cum)
+            # sprite angle for every segment (last point repeats the last segment)
+            angles.append(route.segment_headings + route.segment_headings[-1:])
+            # unit direction of every segment, the forward vector of the geometric search
+            dirs = [(d.x, d.y) for d in route.segment_directions]
+            directions.append(dirs + dirs[-1:])
+
+            base += cum[-1] + 1.0
+            offset += len(pts)
+
+            for k, edge in enumerate(route.edges):
+                self.edge_id[r, k] = edge_ids[edge]
+                self.edge_start[r, k] = cum[route.edge_offsets[k]]
+            self.edge_end[r, :len(route.edges)] = self.edge_start[r, 1:len(route.edges) + 1]
+            self.edge_end[r, len(route.edges) - 1] = cum[-1]
+
+            self.stop_dist[r] = route.stop_distance
+
+            if opposing_routes(route.id) and route.left_turn_wait_index >= 0:
+                self.is_left[r] = True
+                self.wait_dist[r] = cum[route.left_turn_wait_index]
+
+        for name, r in self.index.items():
+            for other in opposing_routes(name):
+                if other in self.index:
+                    self.opposing[r, self.index[other]] = True
+
+        self.points = np.concatenate(points)
+        self.keys = np.concatenate(keys)
+        self.angles = np.concatenate(angles)
+        self.directions = np.concatenate([np.array(d, dtype=float) for d in directions])
+
+
+class NumpyEngine:
+    def __init__(self, graph, routes, traffic_lights, capacity=1024):
+        self.table = RouteTable(routes, find_shared_edges(graph))
+        self.traffic_lights = traffic_lights
+        self.light_index = {id(tl): i for i, tl in enumerate(traffic_lights)}
+
+        self.count = 0
+        self.vehicles = []      # Vehicle views, aligned with the array slots
+        self.zone_events = []   # (ambulance, entered) for ambulance zone crossings in the last step
+        self.changed = False    # whether the last step moved, turned or held any vehicle differently
+        self.views_dirty = False    # whether the arrays moved on since the views were last synced
+        # opposing traffic this close to the centre holds left turns, as in RouteOccupancy
+        self.yield_radius_sq = get_profile("car").left_turn_yield_distance ** 2
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = self.count
+        def grow(name, dtype, fill=0):
+            arr = np.full(capacity, fill, dtype=dtype)
+            if hasattr(self, name):
+                arr[:old] = getattr(self, name)[:old]
+            setattr(self, name, arr)
+
+        grow("route", np.int64)
+        grow("light", np.int64)
+        grow("dist", float)
+        grow("max_speed", float)
+        grow("speed", float)
+        grow("angle", float)
+        grow("x", float)
+        grow("y", float)
+        grow("stop_gap", float)
+        grow("safe_gap", float)
+        grow("min_speed", float)
+        grow("yields", bool)
+        grow("lane_width", float)
+        grow("lookahead", float)
+        grow("is_ambulance", bool)
+        grow("finished", bool)
+        grow("waiting_at_left_turn", bool)
+        grow("in_ambulance_zone", bool)
+        grow("in_traffic_zone", bool)
+        self.capacity = capacity
+
+    def add(self, vehicle):
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        i = self.count
+        r = self.table.index[vehicle.route.id]
+        self.route[i] = r
+        self.light[i] = self.light_index[id(vehicle.traffic_light)]
+        self.dist[i] = vehicle.distance
+        self.max_speed[i] = vehicle.max_speed
+        self.speed[i] = vehicle.max_speed
+        self.angle[i] = vehicle.angle
+        self.x[i] = vehicle.position.x
+        self.y[i] = vehicle.position.y
+        profile = vehicle.profile
+        self.stop_gap[i] = profile.stop_gap
+        self.safe_gap[i] = profile.safe_gap
+        self.min_speed[i] = profile.min_speed
+        self.yields[i] = profile.yields_on_left_turn
+        self.lane_width[i] = profile.lane_width
+        self.lookahead[i] = profile.lookahead_distance
+        self.is_ambulance[i] = vehicle.type == "ambulance"
+        self.finished[i] = False
+        self.waiting_at_left_turn[i] = False
+        self.in_ambulance_zone[i] = False
+        self.in_traffic_zone[i] = False
+
+        self.vehicles.append(vehicle)
+        self.count += 1
+
+    def add_all(self, vehicles):
+        for vehicle in vehicles:
+            self.add(vehicle)
+
+    def clear(self):
+        self.count = 0
+        self.vehicles = []
+        self.zone_events = []
+
+    def _leader_gaps(self, n, route, dist, active):
+        # Sort every vehicle by (edge, progress along edge); the vehicle right
+        # after it in that order on the same edge is its leader
+        t = self.table
+        k = (t.edge_start[route] <= dist[:, None]).sum(axis=1) - 1
+        # finished vehicles are parked on a lane of their own until removed
+        edge = np.where(active, t.edge_id[route, k], -1)
+        local = dist - t.edge_start[route, k]
+
+        # ties (same spawn point) go to the lower slot, which was added first
+        slots = np.arange(n)
+        order = np.lexsort((-slots, local, edge))
+        edge_s = edge[order]
+        local_s = local[order]
+
+        gap_s = np.full(n, np.inf)
+        same = edge_s[1:] == edge_s[:-1]
+        gap_s[:-1][same] = local_s[1:][same] - local_s[:-1][same]
+
+        # Front vehicle on an edge follows the rearmost vehicle on any edge
+        # leaving the node ahead, like LaneOccupancy._first_ahead
+        rear = np.ones(n, dtype=bool)
+        rear[1:] = ~same
+        rear &= edge_s >= 0
+        node_rear = np.full(t.node_count, np.inf)
+        np.minimum.at(node_rear, t.edge_start_node[edge_s[rear]], local_s[rear])
+
+        front = np.ones(n, dtype=bool)
+        front[:-1] = ~same
+        front_slots = order[front]
+        next_edge = t.edge_id[route[front_slots], k[front_slots] + 1]
+        has_next = next_edge >= 0
+        front_gap = np.full(len(front_slots), np.inf)
+        remaining = t.edge_end[route[front_slots], k[front_slots]] - dist[front_slots]
+        front_gap[has_next] = remaining[has_next] + node_rear[t.edge_start_node[next_edge[has_next]]]
+        gap_s[front] = front_gap
+
+        gap = np.empty(n)
+        gap[order] = gap_s
+
+        # Where lanes branch or merge, search by geometry like Vehicle does
+        searchers = np.flatnonzero(active & t.edge_shared[np.maximum(edge, 0)])
+        if len(searchers):
+            to_node = t.edge_end[route, np.minimum(k, t.edge_end.shape[1] - 1)] - dist
+            gap[searchers] = self._nearest_ahead(n, route, dist, active, searchers, to_node)
+        return gap
+
+    def _nearest_ahead(self, n, route, dist, active, searchers, to_node):
+        """Distance from each searcher to the nearest vehicle ahead in its lane, as in
+        Vehicle.get_nearest_vehicle_ahead, with the vehicles binned into a grid."""
+        t = self.table
+        x = self.x[:n]
+        y = self.y[:n]
+        cell = self.lookahead[searchers].max()
+
+        # candidates sorted by grid cell
+        candidates = np.flatnonzero(active)
+        cx = np.floor(x[candidates] / cell).astype(np.int64)
+        cy = np.floor(y[candidates] / cell).astype(np.int64)
+        cell_key = (cx << 32) + cy
+        by_cell = np.argsort(cell_key, kind="stable")
+        cell_key = cell_key[by_cell]
+        candidates = candidates[by_cell]
+
+        # (searcher, candidate) pairs from the 3x3 cells around every searcher
+        sx = np.floor(x[searchers] / cell).astype(np.int64)
+        sy = np.floor(y[searchers] / cell).astype(np.int64)
+        pair_i, pair_j = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                key = ((sx + dx) << 32) + (sy + dy)
+                lo = np.searchsorted(cell_key, key, side="left")
+                count = np.searchsorted(cell_key, key, side="right") - lo
+                total = int(count.sum())
+                if total == 0:
+                    continue
+                starts = np.repeat(lo - (np.cumsum(count) - count), count)
+                pair_i.append(np.repeat(searchers, count))
+                pair_j.append(candidates[starts + np.arange(total)])
+        gaps = np.full(len(searchers), np.inf)
+        if not pair_i:
+            return gaps
+        i = np.concatenate(pair_i)
+        j = np.concatenate(pair_j)
+
+        seg = np.searchsorted(t.keys, t.base[route[i]] + dist[i], side="right") - 1
+        seg = np.clip(seg, t.first_point[route[i]], t.last_segment[route[i]])
+        fx = t.directions[seg, 0]
+        fy = t.directions[seg, 1]
+        to_x = x[j] - x[i]
+        to_y = y[j] - y[i]
+        d = np.sqrt(to_x * to_x + to_y * to_y)
+        ahead = (
+            (d > 0) & (d < self.lookahead[i])
+            & (fx * to_x + fy * to_y > 0)
+            & (np.abs(fx * to_y - fy * to_x) <= self.lane_width[i])
+        )
+
+        # Two vehicles converging on a merge can each see the other ahead, and
+        # since every vehicle moves at once neither would ever go. The one
+        # closer to the end of its edge goes first (ties: the older slot).
+        pair = i * n + j
+        mutual = ahead & np.isin(pair, (j * n + i)[ahead])
+        goes_first = (to_node[i] < to_node[j]) | ((to_node[i] == to_node[j]) & (i < j))
+        ahead &= ~(mutual & goes_first)
+
+        nearest = np.full(n, np.inf)
+        np.minimum.at(nearest, i[ahead], d[ahead])
+        return nearest[searchers]
+
+    def step(self):
+        """Advance every active vehicle by one tick."""
+        n = self.count
+        self.changed = False
+        if n == 0:
+            return
+        self.views_dirty = True
+        t = self.table
+        route = self.route[:n]
+        dist = self.dist[:n]
+        max_speed = self.max_speed[:n]
+        active = ~self.finished[:n]
+        # what the tick changed decides whether the simulation may skip ahead
+        previous_dist = dist.copy()
+        previous_angle = self.angle[:n].copy()
+        previous_waiting = self.waiting_at_left_turn[:n].copy()
+
+        gap = self._leader_gaps(n, route, dist, active)
+
+        # Car following, same rule as Vehicle.update
+        stop_dist = self.stop_gap[:n] + GAP_BUFFER
+        safe_dist = self.safe_gap[:n] + GAP_BUFFER
+        red = np.array([tl.state in RED_STATES for tl in self.traffic_lights])[self.light[:n]]
+        before_stop = dist < t.stop_dist[route]
+        to_stop = t.stop_dist[route] - dist
+        # like Vehicle.update: close to the stop line on red, drive up to it at
+        # full speed and stay once there; farther back, slow down in the zone
+        red_hold = red & (to_stop >= 0) & (to_stop < RED_HOLD_DISTANCE)
+
+        move = max_speed.copy()
+        slow_zone = red & before_stop & ~red_hold & self.in_traffic_zone[:n]
+        move[slow_zone] *= 0.5
+        follow = (gap - stop_dist) / (safe_dist - stop_dist)
+        move = np.where(
+            gap < stop_dist, 0.0,
+            np.where(gap < safe_dist, np.maximum(self.min_speed[:n], max_speed * follow), move)
+        )
+
+        # Hold at the stop line on red
+        move = np.where(
+            red_hold,
+            np.where(to_stop < RED_STOPPED_DISTANCE, 0.0, np.minimum(move, to_stop - STOP_OFFSET)),
+            move
+        )
+
+        # Left turns wait for opposing straight/right traffic
+        remaining = t.total_length[route] - dist
+        busy_route = np.bincount(
+            route[active & self._in_yield_region(n) & (remaining > 0.3 * t.total_length[route])],
+            minlength=len(t.names)
+        ) > 0
+        busy = (t.opposing & busy_route[None, :]).any(axis=1)[route]
+        to_wait = t.wait_dist[route] - dist
+        # (vehicles held by a red light never get this far in Vehicle.update)
+        yielding = (
+            t.is_left[route] & self.yields[:n] & busy & ~red_hold
+            & (to_wait >= 0) & (to_wait < LEFT_TURN_APPROACH_DISTANCE)
+        )
+        move = np.where(yielding, np.minimum(move, to_wait), move)
+        self.waiting_at_left_turn[:n] = np.where(red_hold, previous_waiting, yielding & (move >= to_wait))
+
+        move[~active] = 0.0
+        self.speed[:n] = move
+        dist += move
+        self.finished[:n] |= dist >= t.total_length[route]
+
+        self._update_positions(n, route, dist, active)
+        self.changed = not (
+            np.array_equal(dist, previous_dist)
+            and np.array_equal(self.angle[:n], previous_angle)
+            and np.array_equal(self.waiting_at_left_turn[:n], previous_waiting)
+        )
+
+    def _in_yield_region(self, n):
+        dx = self.x[:n] - ZONE_CENTER_X
+        dy = self.y[:n] - ZONE_CENTER_Y
+        return dx * dx + dy * dy < self.yield_radius_sq
+
+    def _update_positions(self, n, route, dist, active):
+        t = self.table
+        seg = np.searchsorted(t.keys, t.base[route] + dist, side="right") - 1
+        seg = np.clip(seg, t.first_point[route], t.last_segment[route])
+
+        p0 = t.points[seg]
+        p1 = t.points[seg + 1]
+        seg_len = np.maximum(t.keys[seg + 1] - t.keys[seg], 1e-9)
+        frac = np.clip((t.base[route] + dist - t.keys[seg]) / seg_len, 0.0, 1.0)
+        self.x[:n] = p0[:, 0] + (p1[:, 0] - p0[:, 0]) * frac
+        self.y[:n] = p0[:, 1] + (p1[:, 1] - p0[:, 1]) * frac
+
+        # ease the sprite angle toward the segment heading like Vehicle does
+        angle = self.angle[:n]
+        diff = (t.angles[seg] - angle + 180) % 360 - 180
+        angle += np.where(active, diff * 0.2, 0.0)
+
+        dx = self.x[:n] - ZONE_CENTER_X
+        dy = self.y[:n] - ZONE_CENTER_Y
+        dist_sq = dx * dx + dy * dy
+        in_ambulance_zone = dist_sq < AMBULANCE_ZONE_RADIUS ** 2
+
+        # Ambulances that crossed the ambulance zone edge this tick
+        crossed = np.flatnonzero((in_ambulance_zone != self.in_ambulance_zone[:n]) & self.is_ambulance[:n])
+        self.zone_events = [(self.vehicles[i], bool(in_ambulance_zone[i])) for i in crossed.tolist()]
+        self.in_ambulance_zone[:n] = in_ambulance_zone
+        self.in_traffic_zone[:n] = dist_sq < TRAFFIC_ZONE_RADIUS ** 2
+
+    def remove_finished(self):
+        """Compact the arrays, returning the Vehicle views that finished."""
+        n = self.count
+        finished = self.finished[:n].copy()
+        if not finished.any():
+            return []
+
+        flags = finished.tolist()
+        done = [v for v, f in zip(self.vehicles, flags) if f]
+        for v in done:
+            v.finished = True
+
+        keep = ~finished
+        kept = int(keep.sum())
+        for name in ("route", "light", "dist", "max_speed", "speed", "angle", "x", "y",
+                     "stop_gap", "safe_gap", "min_speed", "yields", "lane_width", "lookahead",
+                     "is_ambulance", "finished", "waiting_at_left_turn",
+                     "in_ambulance_zone", "in_traffic_zone"):
+            arr = getattr(self, name)
+            arr[:kept] = arr[:n][keep]
+        self.vehicles = [v for v, f in zip(self.vehicles, flags) if not f]
+        self.count = kept
+        return done
+
+    def sync_views(self):
+        """Copy array state into the Vehicle objects so they can be drawn."""
+        if not self.views_dirty:
+            return
+        self.views_dirty = False
+        n = self.count
+        rows = zip(
+            self.vehicles,
+            self.x[:n].tolist(),
+            self.y[:n].tolist(),
+            self.angle[:n].tolist(),
+            self.in_ambulance_zone[:n].tolist(),
+            self.in_traffic_zone[:n].tolist(),
+            self.waiting_at_left_turn[:n].tolist(),
+            self.dist[:n].tolist(),
+        )
+        for vehicle, x, y, angle, in_ambulance, in_traffic, waiting, dist in rows:
+            vehicle.distance = dist
+            vehicle.position.update(x, y)
+            vehicle.angle = angle
+            vehicle.isInAmbulanceZone = in_ambulance
+            vehicle.isInTrafficZone = in_traffic
+            vehicle.waiting_at_left_turn = waiting
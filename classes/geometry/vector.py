@@ -0,0 +1,105 @@
+# A small pure-Python 2D vector for the simulation core, so the graph,
+# routes and vehicle physics do not need pygame. It covers the subset of
+# pygame.Vector2 the core uses, with the same arithmetic (so positions come
+# out bit-for-bit the same), and it is a 2-item sequence, so pygame drawing
+# calls and Rect attributes accept it directly.
+import math
+
+
+class Vec2:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x=0.0, y=0.0):
+        # always floats, like pygame: signed zeros and integer division differ otherwise
+        self.x = float(x)
+        self.y = float(y)
+
+    def copy(self):
+        return Vec2(self.x, self.y)
+
+    def update(self, x, y=None):
+        """Set in place from another vector / pair, or from x and y."""
+        if y is None:
+            x, y = x
+        self.x = float(x)
+        self.y = float(y)
+
+    # sequence protocol: unpacking, indexing and pygame's coordinate arguments
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __eq__(self, other):
+        try:
+            ox, oy = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        return self.x == ox and self.y == oy
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Vec2({self.x}, {self.y})"
+
+    def __add__(self, other):
+        if type(other) is Vec2:
+            return Vec2(self.x + other.x, self.y + other.y)
+        ox, oy = other
+        return Vec2(self.x + ox, self.y + oy)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if type(other) is Vec2:
+            return Vec2(self.x - other.x, self.y - other.y)
+        ox, oy = other
+        return Vec2(self.x - ox, self.y - oy)
+
+    def __rsub__(self, other):
+        ox, oy = other
+        return Vec2(ox - self.x, oy - self.y)
+
+    def __mul__(self, scalar):
+        return Vec2(self.x * scalar, self.y * scalar)
+
+    def __rmul__(self, scalar):
+        return Vec2(scalar * self.x, scalar * self.y)
+
+    def __truediv__(self, scalar):
+        # pygame multiplies by the reciprocal, which rounds differently
+        inv = 1 / scalar
+        return Vec2(self.x * inv, self.y * inv)
+
+    def __neg__(self):
+        return Vec2(-self.x, -self.y)
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def length_squared(self):
+        return self.x * self.x + self.y * self.y
+
+    def normalize(self):
+        length = math.sqrt(self.x * self.x + self.y * self.y)
+        if length == 0:
+            raise ValueError("Can't normalize Vector of length Zero")
+        return Vec2(self.x / length, self.y / length)
+
+    def normalize_ip(self):
+        length = math.sqrt(self.x * self.x + self.y * self.y)
+        if length == 0:
+            raise ValueError("Can't normalize Vector of length Zero")
+        self.x /= length
+        self.y /= length
+
+    def lerp(self, other, t):
+        return Vec2(self.x * (1 - t) + other.x * t, self.y * (1 - t) + other.y * t)
@@ -2,12 +2,66 @@
 from classes.graph.node import Node
 from classes.graph.edge import Edge
 
+# Edges of one intersection as (from, to, type), using the node ids of
+# build_node_positions in classes/graph/layout.py. Nodes 16-23 are the far ends of the
+# approach and exit roads.
+INTERSECTION_EDGES = [
+    # Straight connections
+    (0, 5, "straight"),  # from N_in to S_out
+    (2, 7, "straight"),  # from E_in to W_out
+    (4, 1, "straight"),  # from S_in to N_out
+    (6, 3, "straight"),  # from W_in to E_out
+
+    # Right turns
+    (0, 7, "right"),  # from N_in to W_out
+    (2, 1, "right"),  # from E_in to N_out
+    (4, 3, "right"),  # from S_in to E_out
+    (6, 5, "right"),  # from W_in to S_out
+
+    # Left turns
+    (8, 24, "approach"),  # merge to left turn lane
+    (10, 25, "approach"),
+    (12, 26, "approach"),
+    (14, 27, "approach"),
+
+    (24, 3, "left"),  # from N_in to E_out
+    (25, 5, "left"),  # from E_in to S_out
+    (26, 7, "left"),  # from S_in to W_out
+    (27, 1, "left"),  # from W_in to N_out
+
+    # Road → Entry
+    (16, 8, "approach"),
+    (18, 10, "approach"),
+    (20, 12, "approach"),
+    (22, 14, "approach"),
+
+    (8, 0, "approach"),
+    (12, 4, "approach"),
+    (14, 6, "approach"),
+    (10, 2, "approach"),
+
+    # Exit → Road
+    (1, 9, "exit"),
+    (5, 13, "exit"),
+    (3, 11, "exit"),
+    (7, 15, "exit"),
+
+    (9, 17, "exit"),
+    (11, 19, "exit"),
+    (13, 21, "exit"),
+    (15, 23, "exit"),
+]
+
 class RoadGraph:
-    def __init__(self, node_coords):
+    def __init__(self, node_coords=None):
         self.nodes = {}         # list of Nodes
         self.edges = []         # list of Edges
         self.adjacency = {}    # list of outgoing Edge
-        self.build_intersection(node_coords)
+        self.edge_lookup = {}   # (from id, to id) -> Edge
+        self.version = 0        # bumped on every change, so cached drawings know to rebuild
+        # without node_coords the graph starts empty (see classes/graph/grid_builder.py)
+        if node_coords is not None:
+            self.build_intersection(node_coords)
 
     def build_intersection(self, node_coords):
         # Create all nodes 
@@ -15,66 +69,25 @@ class RoadGraph:
             self.add_node(Node(node_id, position.x, position.y))
 
         # Create edges to connect nodes at an intersection
-        # Straight connections
-        self.add_edge(0, 5, edge_type="straight") # from N_in to S_out
-        self.add_edge(2, 7, edge_type="straight") # from E_in to W_out
-        self.add_edge(4, 1, edge_type="straight") # from S_in to N_out
-        self.add_edge(6, 3, edge_type="straight") # from W_in to E_out
-
-        # Right turns
-        self.add_edge(0, 7, edge_type="right") # from N_in to W_out
-        self.add_edge(2, 1, edge_type="right") # from E_in to N_out
-        self.add_edge(4, 3, edge_type="right") # from S_in to E_out
-        self.add_edge(6, 5, edge_type="right") # from W_in to S_out
-
-        # Left turns
-        self.add_edge(8, 24, edge_type="approach") # merge to left turn lane
-        self.add_edge(10, 25, edge_type="approach")
-        self.add_edge(12, 26, edge_type="approach")
-        self.add_edge(14, 27, edge_type="approach")
-
-        self.add_edge(24, 3, edge_type="left") # from N_in to E_out
-        self.add_edge(25, 5, edge_type="left") # from E_in to S_out
-        self.add_edge(26, 7, edge_type="left") # from S_in to W_out
-        self.add_edge(27, 1, edge_type="left") # from W_in to N_out
-
-        # Road → Entry
-        self.add_edge(16, 8, edge_type="approach")
-        self.add_edge(18, 10, edge_type="approach")
-        self.add_edge(20, 12, edge_type="approach")
-        self.add_edge(22, 14, edge_type="approach")
-
-        self.add_edge(8, 0, edge_type="approach") 
-        self.add_edge(12, 4, edge_type="approach")
-        self.add_edge(14, 6, edge_type="approach")
-        self.add_edge(10, 2, edge_type="approach")
-
-        # Exit → Road
-        self.add_edge(1, 9, edge_type="exit")
-        self.add_edge(5, 13, edge_type="exit")
-        self.add_edge(3, 11, edge_type="exit")
-        self.add_edge(7, 15, edge_type="exit")
-
-        self.add_edge(9, 17, edge_type="exit")
-        self.add_edge(11, 19, edge_type="exit")
-        self.add_edge(13, 21, edge_type="exit")
-        self.add_edge(15, 23, edge_type="exit")
+        for from_id, to_id, edge_type in INTERSECTION_EDGES:
+            self.add_edge(from_id, to_id, edge_type=edge_type)
 
 
     def add_node(self, node):
         self.nodes[node.id] = node
         self.adjacency[node.id] = []
+        self.version += 1
 
     def add_edge(self, from_id, to_id, edge_type="straight"):
         edge = Edge(self.nodes[from_id], self.nodes[to_id], edge_type)
         self.adjacency[from_id].append(edge)
         self.edges.append(edge)
+        # keep the first edge between two nodes, as the adjacency scan did
+        self.edge_lookup.setdefault((from_id, to_id), edge)
+        self.version += 1
 
     def get_edge(self, from_id, to_id):
-        for edge in self.adjacency[from_id]:
-            if edge.end.id == to_id:
-                return edge
-        return None
+        return self.edge_lookup.get((from_id, to_id))
 
     def debug_print(self):
         print("=== ROAD GRAPH DEBUG ===")
@@ -0,0 +1,149 @@
+# Builds a rows x cols city grid out of copies of the single intersection
+# of classes/graph/layout.py. Neighbouring intersections are joined
+# exit-to-approach, the outer sides get road ends like the single-screen
+# layout, and every intersection gets its own four traffic lights.
+#
+# Node ids: intersection k = row * cols + col owns ids k * 28 + local id,
+# where the local ids are the 0-27 of build_node_positions.
+from classes.geometry.vector import Vec2
+from classes.graph.graph import INTERSECTION_EDGES, RoadGraph
+from classes.graph.node import Node
+from classes.route.route_map import MOVEMENTS, ROUTE_TO_TRAFFIC_LIGHT, build_route
+from classes.traffic_light.traffic_light import build_traffic_lights
+
+NODES_PER_INTERSECTION = 28
+ROAD_THICKNESS = 100
+INTERSECTION_SPACING = 600      # centre to centre, must exceed 2 * (2 * ROAD_THICKNESS + ROAD_THICKNESS // 4)
+
+# side -> (road end in, approach node, exit node, road end out), local ids
+SIDES = {
+    "N": (16, 8, 9, 17),
+    "E": (18, 10, 11, 19),
+    "S": (20, 12, 13, 21),
+    "W": (22, 14, 15, 23),
+}
+ROAD_END_IDS = range(16, 24)
+
+# Grid movements start at the approach node, so the stop node is nodes[1]
+GRID_STOP_NODE_INDEX = 1
+
+
+def intersection_offsets(road_thickness, reach):
+    """Local node id -> offset from the intersection centre; road ends sit reach away."""
+    half_road = road_thickness // 2
+    offset = road_thickness // 4
+    inner = half_road + offset
+    outer = 4 * half_road + offset
+    end = reach + offset
+
+    return {
+        0: (-offset, -inner), 1: (offset, -inner),
+        2: (inner, -offset), 3: (inner, offset),
+        4: (offset, inner), 5: (-offset, inner),
+        6: (-inner, offset), 7: (-inner, -offset),
+
+        8: (-offset, -outer), 9: (offset, -outer),
+        10: (outer, -offset), 11: (outer, offset),
+        12: (offset, outer), 13: (-offset, outer),
+        14: (-outer, offset), 15: (-outer, -offset),
+
+        16: (-offset, -end), 17: (offset, -end),
+        18: (end, -offset), 19: (end, offset),
+        20: (offset, end), 21: (-offset, end),
+        22: (-end, offset), 23: (-end, -offset),
+
+        24: (0, -inner), 25: (inner, 0),
+        26: (0, inner), 27: (-inner, 0),
+    }
+
+
+class Intersection:
+    def __init__(self, index, row, col, center):
+        self.index = index
+        self.row = row
+        self.col = col
+        self.center = center
+        self.base_id = index * NODES_PER_INTERSECTION
+        self.traffic_lights = []    # same order and ids as build_traffic_lights
+
+    def node_id(self, local_id):
+        return self.base_id + local_id
+
+
+class GridNetwork:
+    def __init__(self, graph, rows, cols, intersections):
+        self.graph = graph
+        self.rows = rows
+        self.cols = cols
+        self.intersections = intersections
+        self.traffic_lights = [tl for inter in intersections for tl in inter.traffic_lights]
+
+        # "row,col:movement" -> (node ids, traffic light), routes are built on demand
+        self.route_lights = {}
+        self.route_nodes = {}
+        for inter in intersections:
+            for movement, local_ids in MOVEMENTS.items():
+                route_id = f"{inter.row},{inter.col}:{movement}"
+                # start at the approach node and end at the exit node, which
+                # exist on every side whether or not it borders another intersection
+                self.route_nodes[route_id] = [inter.node_id(i) for i in local_ids[1:-1]]
+                self.route_lights[route_id] = inter.traffic_lights[ROUTE_TO_TRAFFIC_LIGHT[movement]]
+
+    def get_intersection(self, row, col):
+        return self.intersections[row * self.cols + col]
+
+    def build_route(self, route_id):
+        return build_route(self.graph, route_id, self.route_nodes[route_id], GRID_STOP_NODE_INDEX)
+
+
+def build_grid(rows, cols, spacing=INTERSECTION_SPACING, road_thickness=ROAD_THICKNESS, origin=(0, 0)):
+    """Build a rows x cols GridNetwork whose top-left intersection is centred spacing / 2 from origin."""
+    graph = RoadGraph()
+    offsets = intersection_offsets(road_thickness, spacing // 2)
+    internal_edges = [
+        (a, b, edge_type) for a, b, edge_type in INTERSECTION_EDGES
+        if a not in ROAD_END_IDS and b not in ROAD_END_IDS
+    ]
+    inner_ids = [i for i in offsets if i not in ROAD_END_IDS]
+
+    intersections = []
+    for row in range(rows):
+        for col in range(cols):
+            center = (origin[0] + spacing // 2 + col * spacing, origin[1] + spacing // 2 + row * spacing)
+            inter = Intersection(len(intersections), row, col, center)
+            intersections.append(inter)
+
+            cx, cy = center
+            base = inter.base_id
+            for local_id in inner_ids:
+                dx, dy = offsets[local_id]
+                graph.add_node(Node(base + local_id, cx + dx, cy + dy))
+            for a, b, edge_type in internal_edges:
+                graph.add_edge(base + a, base + b, edge_type=edge_type)
+
+            # Road ends only on the outer sides of the grid
+            borders = {"N": row == 0, "S": row == rows - 1, "W": col == 0, "E": col == cols - 1}
+            for side, (end_in, approach, exit_node, end_out) in SIDES.items():
+                if not borders[side]:
+                    continue
+                for local_id in (end_in, end_out):
+                    dx, dy = offsets[local_id]
+                    graph.add_node(Node(base + local_id, cx + dx, cy + dy))
+                graph.add_edge(base + end_in, base + approach, edge_type="approach")
+                graph.add_edge(base + exit_node, base + end_out, edge_type="exit")
+
+            node_pos = {i: Vec2(cx + offsets[i][0], cy + offsets[i][1]) for i in (1, 3, 5, 7)}
+            inter.traffic_lights = build_traffic_lights(node_pos)
+
+    # Join neighbours: one intersection's exit node feeds the next one's approach node
+    for inter in intersections:
+        if inter.col + 1 < cols:
+            east = intersections[inter.index + 1]
+            graph.add_edge(inter.node_id(SIDES["E"][2]), east.node_id(SIDES["W"][1]), edge_type="approach")
+            graph.add_edge(east.node_id(SIDES["W"][2]), inter.node_id(SIDES["E"][1]), edge_type="approach")
+        if inter.row + 1 < rows:
+            south = intersections[inter.index + cols]
+            graph.add_edge(inter.node_id(SIDES["S"][2]), south.node_id(SIDES["N"][1]), edge_type="approach")
+            graph.add_edge(south.node_id(SIDES["N"][2]), inter.node_id(SIDES["S"][1]), edge_type="approach")
+
+    return GridNetwork(graph, rows, cols, intersections)
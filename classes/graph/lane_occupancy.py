@@ -0,0 +1,98 @@
+# Per-edge vehicle queues ordered by progress along the edge, used to hand
+# every vehicle its leader without searching the other vehicles by geometry.
+# Edges that branch off or merge with another edge are marked shared: the
+# vehicles on them can meet traffic from other lanes, so they still search.
+# At the end of an edge that splits, the leader is the nearest vehicle past
+# the split on any branch, not only on the vehicle's own.
+
+
+def find_shared_edges(graph):
+    """Edges of graph that branch off or merge with another edge."""
+    incoming = {}
+    for edge in graph.edges:
+        incoming[edge.end.id] = incoming.get(edge.end.id, 0) + 1
+    return {
+        edge for edge in graph.edges
+        if len(graph.adjacency[edge.start.id]) > 1 or incoming[edge.end.id] > 1
+    }
+
+
+class LaneOccupancy:
+    def __init__(self, graph):
+        self.lanes = {edge: [] for edge in graph.edges}  # Edge -> vehicles, rear first
+        self.occupied = set()                             # edges holding any vehicle
+        self.adjacency = graph.adjacency                  # node id -> outgoing edges
+        self.shared = find_shared_edges(graph)
+
+    def clear(self):
+        for edge in self.occupied:
+            for vehicle in self.lanes[edge]:
+                vehicle.lane = None
+                vehicle.lane_shared = False
+                vehicle.leader = None
+                vehicle.follower = None
+            self.lanes[edge].clear()
+        self.occupied.clear()
+
+    def remove(self, vehicle):
+        if vehicle.lane is None:
+            return
+        lane = self.lanes[vehicle.lane]
+        lane.remove(vehicle)
+        if not lane:
+            self.occupied.discard(vehicle.lane)
+        vehicle.lane = None
+        vehicle.lane_shared = False
+        vehicle.leader = None
+        vehicle.follower = None
+
+    def update(self, vehicles):
+        """Move vehicles between edges, re-sort each lane and relink leaders (once per tick)."""
+        for order, vehicle in enumerate(vehicles):
+            edge_index, progress = vehicle.get_lane_position()
+            edge = vehicle.route.edges[edge_index]
+            vehicle.lane_index = edge_index
+            # Ties (e.g. vehicles spawned on the same point) go to whoever is
+            # updated first, since it gets to move away first
+            vehicle.lane_progress = (progress, -order)
+
+            if vehicle.lane is not edge:
+                if vehicle.lane is not None:
+                    self.remove(vehicle)
+                self.lanes[edge].append(vehicle)
+                self.occupied.add(edge)
+                vehicle.lane = edge
+                vehicle.lane_shared = edge in self.shared
+
+        # Order rarely changes between ticks, so these sorts are close to linear
+        for edge in self.occupied:
+            self.lanes[edge].sort(key=lambda v: v.lane_progress)
+
+        for edge in self.occupied:
+            lane = self.lanes[edge]
+            last = len(lane) - 1
+            for i, vehicle in enumerate(lane):
+                vehicle.follower = lane[i - 1] if i > 0 else None
+                vehicle.leader = lane[i + 1] if i < last else self._first_ahead(vehicle)
+
+    def _first_ahead(self, vehicle):
+        # Rearmost vehicle past the end of this vehicle's edge: on any edge
+        # leaving that node (right after a split the other branch is still in
+        # the way), else on the next occupied edge of this vehicle's route.
+        # Merging routes (e.g. into the shared exit edges) meet here.
+        edges = vehicle.route.edges
+        k = vehicle.lane_index + 1
+        if k >= len(edges):
+            return None
+        nearest = None
+        for edge in self.adjacency[edges[k].start.id]:
+            lane = self.lanes[edge]
+            if lane and (nearest is None or lane[0].lane_progress < nearest.lane_progress):
+                nearest = lane[0]
+        if nearest is not None:
+            return nearest
+        for k in range(k + 1, len(edges)):
+            lane = self.lanes[edges[k]]
+            if lane:
+                return lane[0]
+        return None
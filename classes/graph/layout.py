@@ -0,0 +1,50 @@
+# Node positions of the single intersection the window shows, as plain
+# vectors so the graph can be built without pygame. Node ids are the ones
+# INTERSECTION_EDGES and the route movements refer to.
+from classes.geometry.vector import Vec2
+
+SCREEN_WIDTH = 1000
+SCREEN_HEIGHT = 800
+ROAD_THICKNESS = SCREEN_WIDTH // 10
+
+
+def build_node_positions(screen_width=SCREEN_WIDTH, screen_height=SCREEN_HEIGHT, road_thickness=ROAD_THICKNESS):
+    """Node id -> position of the single-screen intersection drawn by manager/window.py."""
+    halfX = screen_width // 2
+    halfY = screen_height // 2
+    halfRoad = road_thickness // 2
+    offset = road_thickness // 4
+
+    return {
+        0: Vec2(halfX - offset,           halfY - (halfRoad + offset)),
+        1: Vec2(halfX + offset,           halfY - (halfRoad + offset)),
+        2: Vec2(halfX + (halfRoad+offset), halfY - offset),
+        3: Vec2(halfX + (halfRoad+offset), halfY + offset),
+        4: Vec2(halfX + offset,           halfY + (halfRoad + offset)),
+        5: Vec2(halfX - offset,           halfY + (halfRoad + offset)),
+        6: Vec2(halfX - (halfRoad+offset), halfY + offset),
+        7: Vec2(halfX - (halfRoad+offset), halfY - offset),
+
+        8: Vec2(halfX - offset,           halfY - (4*halfRoad + offset)),
+        9: Vec2(halfX + offset,           halfY - (4*halfRoad + offset)),
+        10: Vec2(halfX + (4*halfRoad+offset), halfY - offset),
+        11: Vec2(halfX + (4*halfRoad+offset), halfY + offset),
+        12: Vec2(halfX + offset,           halfY + (4*halfRoad + offset)),
+        13: Vec2(halfX - offset,           halfY + (4*halfRoad + offset)),
+        14: Vec2(halfX - (4*halfRoad+offset), halfY + offset),
+        15: Vec2(halfX - (4*halfRoad+offset), halfY - offset),
+
+        16: Vec2(halfX - offset,           0 - offset),
+        17: Vec2(halfX + offset,           0 - offset),
+        18: Vec2(screen_width + offset, halfY - offset),
+        19: Vec2(screen_width + offset, halfY + offset),
+        20: Vec2(halfX + offset,           screen_height + offset),
+        21: Vec2(halfX - offset,           screen_height + offset),
+        22: Vec2(0 - offset, halfY + offset),
+        23: Vec2(0 - offset, halfY - offset),
+
+        24: Vec2(halfX,           halfY - (halfRoad + offset)),
+        25: Vec2(halfX + (halfRoad+offset), halfY),
+        26: Vec2(halfX,           halfY + (halfRoad + offset)),
+        27: Vec2(halfX - (halfRoad+offset), halfY),
+    }
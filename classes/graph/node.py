@@ -1,9 +1,9 @@
-import pygame
+from classes.geometry.vector import Vec2
 
 class Node:
     def __init__(self, node_id, x, y):
         self.id = node_id
-        self.position = pygame.Vector2(x, y)
+        self.position = Vec2(x, y)
 
     def get_x(self):
         return self.position.x
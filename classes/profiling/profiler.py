@@ -0,0 +1,103 @@
+# Named phase timers for the main loop and Vehicle.update. Disabled by
+# default: phase() then hands back one shared no-op context manager, so
+# instrumented code only pays for an attribute check and a call.
+from collections import deque
+from contextlib import nullcontext
+import json
+import time
+
+ROLLING_WINDOW = 300     # samples kept per phase (5 s of frames at 60 fps)
+
+_NO_PHASE = nullcontext()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class PhaseStats:
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)     # most recent durations, seconds
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, duration):
+        self.samples.append(duration)
+        self.count += 1
+        self.total += duration
+
+    def summary(self):
+        recent = sorted(self.samples)
+        n = len(recent)
+        return {
+            "count": self.count,
+            "total_ms": 1000 * self.total,
+            "mean_ms": 1000 * sum(recent) / n if n else 0.0,
+            "p95_ms": 1000 * recent[min(n - 1, int(n * 0.95))] if n else 0.0,
+            "max_ms": 1000 * recent[-1] if n else 0.0,
+            "last_ms": 1000 * self.samples[-1] if n else 0.0,
+        }
+
+
+class Profiler:
+    def __init__(self, window=ROLLING_WINDOW):
+        self.enabled = False
+        self.window = window
+        self.phases = {}        # name -> PhaseStats, in first-seen order
+
+    def phase(self, name):
+        """Context manager timing the enclosed block under name."""
+        if not self.enabled:
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def record(self, name, duration):
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(self.window)
+        stats.add(duration)
+
+    def reset(self):
+        self.phases.clear()
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self.phases.items()}
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def draw_overlay(self, screen, font, x=10, y=60):
+        """Draw one line per phase: rolling mean / p95 / max in milliseconds. Returns the drawn rect."""
+        import pygame   # only needed for the overlay
+
+        rows = [("phase", "mean", "p95", "max")]
+        for name, stats in self.summary().items():
+            rows.append((name, f"{stats['mean_ms']:.2f}", f"{stats['p95_ms']:.2f}", f"{stats['max_ms']:.2f}"))
+
+        columns = (0, 190, 250, 310)
+        line_height = font.get_linesize()
+        panel = pygame.Surface((columns[-1] + 60, line_height * len(rows) + 8), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        panel_rect = screen.blit(panel, (x - 4, y - 4))
+        for row in rows:
+            for offset, text in zip(columns, row):
+                screen.blit(font.render(text, True, (255, 255, 255)), (x + offset, y))
+            y += line_height
+        return panel_rect
+
+
+# one profiler shared by the main loop, Simulation and Vehicle
+PROFILER = Profiler()
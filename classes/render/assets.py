@@ -0,0 +1,37 @@
+# Process-wide image registry. Each asset is loaded and converted once and
+# the same surface is shared by every vehicle that uses it.
+import os
+import pygame
+
+ASSET_DIR = "assets"
+
+
+class AssetRegistry:
+    def __init__(self, asset_dir=ASSET_DIR):
+        self.asset_dir = asset_dir
+        self.images = {}        # name -> converted surface
+
+    def get(self, name):
+        image = self.images.get(name)
+        if image is None:
+            # convert_alpha needs a display mode to be set first
+            image = pygame.image.load(os.path.join(self.asset_dir, f"{name}.png")).convert_alpha()
+            self.images[name] = image
+        return image
+
+    def preload(self, names=None):
+        """Load the given assets (default: every png in the asset dir) up front."""
+        if names is None:
+            names = [
+                os.path.splitext(file)[0]
+                for file in sorted(os.listdir(self.asset_dir))
+                if file.endswith(".png")
+            ]
+        for name in names:
+            self.get(name)
+
+    def clear(self):
+        self.images.clear()
+
+
+ASSETS = AssetRegistry()
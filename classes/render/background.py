@@ -0,0 +1,35 @@
+# Static scene layer. Roads, lane markings, edges, nodes and zone circles
+# never move, so they are drawn once into an off-screen surface per
+# "Show Lines" setting and each frame starts with a single blit.
+import pygame
+
+
+class BackgroundCache:
+    def __init__(self, draw):
+        # draw(surface, graph, show_lines) paints the full static scene
+        self.draw = draw
+        self.graph = None
+        self.graph_version = None
+        self.size = None
+        self.surfaces = {}      # show_lines -> surface
+
+    def get(self, graph, size, show_lines):
+        """Return the background for show_lines, redrawing only after the graph or size changed."""
+        if graph is not self.graph or graph.version != self.graph_version or size != self.size:
+            self.invalidate()
+            self.graph = graph
+            self.graph_version = graph.version
+            self.size = size
+
+        surface = self.surfaces.get(show_lines)
+        if surface is None:
+            surface = pygame.Surface(size).convert()
+            self.draw(surface, graph, show_lines)
+            self.surfaces[show_lines] = surface
+        return surface
+
+    def blit(self, screen, graph, show_lines):
+        screen.blit(self.get(graph, screen.get_size(), show_lines), (0, 0))
+
+    def invalidate(self):
+        self.surfaces.clear()
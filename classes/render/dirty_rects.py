@@ -0,0 +1,47 @@
+# Dirty-rectangle presenting. Instead of redrawing and flipping the whole
+# window, only the areas drawn last frame are restored from the cached
+# background, and only those plus this frame's areas are sent to the display.
+import pygame
+
+
+class DirtyRectRenderer:
+    def __init__(self, screen):
+        self.screen = screen
+        self.bounds = screen.get_rect()
+        self.background = None
+        self.previous = []      # rects drawn last frame, to be erased this frame
+        self.current = []       # rects drawn so far this frame
+        self.full = True
+
+    def begin(self, background):
+        """Erase last frame's drawings. A new background surface means a full redraw."""
+        if background is not self.background:
+            self.screen.blit(background, (0, 0))
+            self.background = background
+            self.full = True
+        else:
+            for rect in self.previous:
+                self.screen.blit(background, rect, rect)
+            self.full = False
+        self.current = []
+
+    def add(self, rect):
+        rect = rect.clip(self.bounds)
+        if rect.width and rect.height:
+            self.current.append(rect)
+
+    def extend(self, rects):
+        for rect in rects:
+            self.add(rect)
+
+    def present(self):
+        if self.full:
+            pygame.display.flip()
+        else:
+            # erased areas must reach the display too, or stale sprites stay visible
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+
+    def invalidate(self):
+        """Force a full redraw next frame."""
+        self.background = None
@@ -0,0 +1,68 @@
+# Draws the simulation objects with pygame. The core (graph, routes, lights
+# and vehicle physics) never imports pygame; the window, the benchmark and
+# anything else that draws goes through this adapter instead.
+import pygame
+
+from classes.render.assets import ASSETS
+from classes.render.sprite_cache import ROTATION_CACHE
+from classes.traffic_light.light_state import LightState
+
+LIGHT_RADIUS = 6
+LIGHT_COLORS = {
+    LightState.NS_GREEN: (0, 255, 0),
+    LightState.EW_GREEN: (0, 255, 0),
+    LightState.NS_YELLOW: (255, 255, 0),
+    LightState.EW_YELLOW: (255, 255, 0),
+}
+RED_LIGHT_COLOR = (255, 0, 0)
+
+
+class PygameRenderer:
+    def __init__(self, assets=ASSETS, rotation_cache=ROTATION_CACHE):
+        self.assets = assets
+        self.rotation_cache = rotation_cache
+
+    def draw_traffic_lights(self, screen, traffic_lights):
+        """Draw every light as a coloured dot. Returns the rects drawn."""
+        return [
+            pygame.draw.circle(screen, LIGHT_COLORS.get(tl.state, RED_LIGHT_COLOR), tl.pos, LIGHT_RADIUS)
+            for tl in traffic_lights
+        ]
+
+    def vehicle_sprite(self, vehicle):
+        """The rotated sprite of vehicle and its rect, centred on the vehicle's position."""
+        profile = vehicle.profile
+        image = self.rotation_cache.get(profile.asset, self.assets.get(profile.asset), vehicle.angle)
+        # The rect lives on the vehicle (and survives pooling) so it is not reallocated every frame
+        rect = vehicle.sprite_rect
+        if rect is None:
+            rect = vehicle.sprite_rect = image.get_rect(center=vehicle.position)
+        else:
+            # Same placement as get_rect(center=...) on a new rect
+            rect.center = vehicle.position
+            center = rect.center
+            rect.size = image.get_size()
+            rect.center = center
+        return image, rect
+
+    def draw_vehicles(self, screen, vehicles, siren_on=True):
+        """Blit every vehicle, plus the sirens when siren_on. Returns the rects drawn."""
+        rects = []
+        for vehicle in vehicles:
+            image, rect = self.vehicle_sprite(vehicle)
+            rects.append(screen.blit(image, rect))
+
+            profile = vehicle.profile
+            if profile.siren_asset is not None and siren_on:
+                siren = self.rotation_cache.get(
+                    profile.siren_asset, self.assets.get(profile.siren_asset), vehicle.angle
+                )
+                # Rotate the offset around the center
+                rotated_offset = pygame.Vector2(profile.siren_offset).rotate(-vehicle.angle)
+                siren_rect = siren.get_rect(center=rect.center + rotated_offset)
+                rects.append(screen.blit(siren, siren_rect))
+        return rects
+
+
+# one renderer shared by everything that draws
+RENDERER = PygameRenderer()
@@ -0,0 +1,39 @@
+# Shared cache of rotated sprites. Angles are snapped to fixed buckets so
+# every vehicle of the same type reuses the same rotated surfaces instead of
+# calling pygame.transform.rotate on every tick.
+from collections import OrderedDict
+import pygame
+
+ANGLE_BUCKET_DEG = 1
+MAX_CACHED_SURFACES = 2048
+
+
+class RotationCache:
+    def __init__(self, bucket_deg=ANGLE_BUCKET_DEG, max_entries=MAX_CACHED_SURFACES):
+        self.bucket_deg = bucket_deg
+        self.bucket_count = int(round(360 / bucket_deg))
+        self.max_entries = max_entries
+        self.entries = OrderedDict()    # (asset, bucket) -> rotated surface, oldest first
+
+    def get(self, asset, image, angle):
+        """Return image rotated to angle (snapped to the bucket size), rotating it at most once."""
+        bucket = int(round(angle / self.bucket_deg)) % self.bucket_count
+        key = (asset, bucket)
+
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            return surface
+
+        surface = pygame.transform.rotate(image, bucket * self.bucket_deg)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+
+# one cache shared by every vehicle
+ROTATION_CACHE = RotationCache()
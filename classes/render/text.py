@@ -0,0 +1,55 @@
+# Fonts and rendered text shared by the UI. SysFont lookups are slow, so
+# each (name, size) font is created once; rendered strings are kept in an
+# LRU cache so static labels are rendered once rather than every frame.
+from collections import OrderedDict
+import pygame
+
+MAX_CACHED_TEXT = 2048
+
+
+class FontRegistry:
+    def __init__(self):
+        self.fonts = {}         # (name, size) -> Font
+
+    def get(self, name, size):
+        """Return the system font name (None = pygame default) at size, created on first use."""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+    def clear(self):
+        self.fonts.clear()
+
+
+class TextCache:
+    def __init__(self, max_entries=MAX_CACHED_TEXT):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()    # (font, text, color) -> surface, oldest first
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        """Antialiased font.render(text), rendered at most once while it stays cached."""
+        key = (font, text, color)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+
+FONTS = FontRegistry()
+TEXT_CACHE = TextCache()
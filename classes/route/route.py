@@ -1,12 +1,96 @@
+import math
+from bisect import bisect_right
+
+from classes.geometry.vector import Vec2
+
 class Route:
     def __init__(self, route_id, nodes, edges):
         self.id = route_id
         self.nodes = nodes      
         self.edges = edges    
-        self.path = None  # list[pygame.Vector2]  
+        self.path = None  # list[Vec2]  
+        self.edge_offsets = None  # path index where each edge starts
+
+        # control points, filled in by build_control_points()
+        self.node_path_index = None   # path index of every node
+        self.stop_index = -1          # path index of the stop line node
+        self.stop_position = None
+        self.left_turn_wait_index = -1
+        self.segment_lengths = None   # length of path[i] -> path[i+1]
+        self.segment_headings = None  # sprite angle (degrees) along path[i] -> path[i+1]
+        self.segment_directions = None  # unit vector along path[i] -> path[i+1]
+        self.cum_lengths = None       # arc length from the start to path[i]
+        self.length = 0.0
+        self.stop_distance = float("inf")
 
     def get_start_node(self):
         return self.nodes[0]
 
     def get_end_node(self):
         return self.nodes[-1]
+
+    def get_edge_index(self, path_index):
+        """Index into self.edges of the edge the path segment path_index lies on."""
+        return bisect_right(self.edge_offsets, path_index) - 1
+
+    def get_node_path_index(self, node_index):
+        if node_index >= len(self.nodes):
+            return len(self.path) - 1
+        return self.node_path_index[node_index]
+
+    def build_control_points(self, stop_node_index):
+        """Precompute the lookups vehicles need every tick once the path is built."""
+        # every node starts an edge, except the last which ends the path
+        self.node_path_index = self.edge_offsets + [len(self.path) - 1]
+
+        if stop_node_index < len(self.nodes):
+            self.stop_index = self.get_node_path_index(stop_node_index)
+            self.stop_position = self.nodes[stop_node_index].position
+
+        # left turns wait where the turning edge starts
+        for k, edge in enumerate(self.edges):
+            if edge.edge_type == "left":
+                self.left_turn_wait_index = self.edge_offsets[k]
+                break
+
+        self.segment_lengths = []
+        self.segment_headings = []
+        self.segment_directions = []
+        self.cum_lengths = [0.0]
+        for start, end in zip(self.path, self.path[1:]):
+            direction = end - start
+            length = direction.length()
+            self.segment_lengths.append(length)
+            self.segment_headings.append(math.degrees(math.atan2(-direction.y, direction.x)) - 90)
+            self.segment_directions.append(direction / length if length > 0 else direction)
+            self.cum_lengths.append(self.cum_lengths[-1] + length)
+        self.length = self.cum_lengths[-1]
+
+        if self.stop_index >= 0:
+            self.stop_distance = self.cum_lengths[self.stop_index]
+
+    def get_segment_index(self, distance, start=0):
+        """Index of the path segment containing distance (searching forward from start)."""
+        index = bisect_right(self.cum_lengths, distance, start) - 1
+        return max(0, min(index, len(self.path) - 2))
+
+    def point_at(self, distance, index=None):
+        """Position at the given arc length along the path."""
+        return self.point_into(distance, Vec2(), index)
+
+    def point_into(self, distance, out, index=None):
+        """Write the position at the given arc length into the vector out (no allocation) and return it."""
+        if index is None:
+            index = self.get_segment_index(distance)
+        start = self.path[index]
+        length = self.segment_lengths[index]
+        if length == 0:
+            out.x = start.x
+            out.y = start.y
+            return out
+        end = self.path[index + 1]
+        t = max(0.0, min(1.0, (distance - self.cum_lengths[index]) / length))
+        # same arithmetic as Vec2.lerp
+        out.x = start.x * (1 - t) + end.x * t
+        out.y = start.y * (1 - t) + end.y * t
+        return out
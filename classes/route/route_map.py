@@ -1,33 +1,47 @@
 from classes.route.route import Route
 
-def build_routes(graph):
-    routes = {}
+STOP_NODE_INDEX = 2  # nodes[2] is where every route enters the intersection
 
+# Node ids of the 12 movements through one intersection
+MOVEMENTS = {
     # North
-    routes["N_straight"] = build_route(graph, "N_straight", [16, 8, 0, 5, 13, 21])
-    routes["N_right"]    = build_route(graph, "N_right",    [16, 8, 0, 7, 15, 23])
-    routes["N_left"]     = build_route(graph, "N_left",     [16, 8, 24, 3, 11, 19])
+    "N_straight": [16, 8, 0, 5, 13, 21],
+    "N_right":    [16, 8, 0, 7, 15, 23],
+    "N_left":     [16, 8, 24, 3, 11, 19],
 
     # East
-    routes["E_straight"] = build_route(graph, "E_straight", [18, 10, 2, 7, 15, 23])
-    routes["E_right"]    = build_route(graph, "E_right",    [18, 10, 2, 1, 9, 17])
-    routes["E_left"]     = build_route(graph, "E_left",     [18, 10, 25, 5, 13, 21])
+    "E_straight": [18, 10, 2, 7, 15, 23],
+    "E_right":    [18, 10, 2, 1, 9, 17],
+    "E_left":     [18, 10, 25, 5, 13, 21],
 
     # South
-    routes["S_straight"] = build_route(graph, "S_straight", [20, 12, 4, 1, 9, 17])
-    routes["S_right"]    = build_route(graph, "S_right",    [20, 12, 4, 3, 11, 19])
-    routes["S_left"]     = build_route(graph, "S_left",     [20, 12, 26, 7, 15, 23])
+    "S_straight": [20, 12, 4, 1, 9, 17],
+    "S_right":    [20, 12, 4, 3, 11, 19],
+    "S_left":     [20, 12, 26, 7, 15, 23],
 
     # West
-    routes["W_straight"] = build_route(graph, "W_straight", [22, 14, 6, 3, 11, 19])
-    routes["W_right"]    = build_route(graph, "W_right",    [22, 14, 6, 5, 13, 21])
-    routes["W_left"]     = build_route(graph, "W_left",     [22, 14, 27, 1, 9, 17])
+    "W_straight": [22, 14, 6, 3, 11, 19],
+    "W_right":    [22, 14, 6, 5, 13, 21],
+    "W_left":     [22, 14, 27, 1, 9, 17],
+}
+
+# Movement -> index into the intersection's traffic light list
+ROUTE_TO_TRAFFIC_LIGHT = {
+    "N_straight": 3, "N_right": 3, "N_left": 3,
+    "S_straight": 2, "S_right": 2, "S_left": 2,
+    "E_straight": 1, "E_right": 1, "E_left": 1,
+    "W_straight": 0, "W_right": 0, "W_left": 0,
+}
 
+def build_routes(graph):
+    routes = {}
+    for route_id, node_ids in MOVEMENTS.items():
+        routes[route_id] = build_route(graph, route_id, node_ids)
     return routes
 
 
 
-def build_route(graph, route_id, node_ids):
+def build_route(graph, route_id, node_ids, stop_node_index=STOP_NODE_INDEX):
     nodes = [graph.nodes[id] for id in node_ids]
     edges = []
 
@@ -40,6 +54,8 @@ def build_route(graph, route_id, node_ids):
 
     route = Route(route_id, nodes, edges)
     route.path = build_path_from_edges(edges, steps=25)
+    route.edge_offsets = get_edge_offsets(edges, steps=25)
+    route.build_control_points(stop_node_index)
     return route
 
     
@@ -47,7 +63,7 @@ def build_route(graph, route_id, node_ids):
 
 
 import math
-import pygame
+from classes.geometry.vector import Vec2
 
 def sample_arc(center, radius, start_rad, end_rad, steps=25):
     pts = []
@@ -56,7 +72,7 @@ def sample_arc(center, radius, start_rad, end_rad, steps=25):
     for i in range(steps + 1):
         t = i / steps
         ang = start_rad + (end_rad - start_rad) * t
-        pts.append(pygame.Vector2(
+        pts.append(Vec2(
             center.x + radius * math.cos(ang),
             center.y + radius * math.sin(ang)
         ))
@@ -87,22 +103,22 @@ def right_turn_points(start, end, radius, steps=25):
     direction = get_right_turn_direction(start, end)
 
     if direction == "NW":
-        center = pygame.Vector2(end.x, start.y)
+        center = Vec2(end.x, start.y)
         start_angle = 0
         end_angle   = 0.5 * math.pi
 
     elif direction == "EN":
-        center = pygame.Vector2(start.x, end.y)
+        center = Vec2(start.x, end.y)
         start_angle = 0.5 * math.pi
         end_angle   = math.pi
 
     elif direction == "SE":
-        center = pygame.Vector2(end.x, start.y)
+        center = Vec2(end.x, start.y)
         start_angle = math.pi
         end_angle   = 1.5 * math.pi
 
     elif direction == "WS":
-        center = pygame.Vector2(start.x, end.y)
+        center = Vec2(start.x, end.y)
         start_angle = 1.5 * math.pi
         end_angle   = 0
 
@@ -135,7 +151,7 @@ def edge_to_points(edge, steps=25):
         if move.length() == 0:
             return [start]
         direction = move.normalize()
-        perp = pygame.Vector2(-direction.y, direction.x)
+        perp = Vec2(-direction.y, direction.x)
         ctrl = start + direction * 40 + perp * 30
 
         return sample_quadratic_bezier(start, ctrl, end, steps)
@@ -151,4 +167,11 @@ def build_path_from_edges(edges, steps=25):
         path.extend(pts)
     return path
 
-
+def get_edge_offsets(edges, steps=25):
+    # path index at which each edge starts, matching build_path_from_edges
+    offsets = []
+    index = 0
+    for e in edges:
+        offsets.append(index)
+        index += len(edge_to_points(e, steps=steps)) - 1
+    return offsets
@@ -0,0 +1,57 @@
+# Per-route sets of vehicles that a left turn has to yield to: inside the
+# yield radius around the intersection with more than 30% of their path
+# left. Kept up to date as vehicles move, so the yielding check only needs
+# to look at the sizes of the opposing routes' sets.
+
+YIELD_REMAINING_SHARE = 0.3
+
+
+class RouteOccupancy:
+    def __init__(self, center, radius):
+        self.center_x = center[0]
+        self.center_y = center[1]
+        self.radius_sq = radius * radius
+        self.routes = {}        # route id -> vehicles currently in the yield region
+        self.route_of = {}      # vehicle -> route id it is counted under
+
+    def clear(self):
+        self.routes.clear()
+        self.route_of.clear()
+
+    def is_in_region(self, vehicle):
+        if vehicle.finished:
+            return False
+        dx = vehicle.position.x - self.center_x
+        dy = vehicle.position.y - self.center_y
+        if dx * dx + dy * dy >= self.radius_sq:
+            return False
+        total_path = vehicle.route.length
+        return total_path - vehicle.distance > total_path * YIELD_REMAINING_SHARE
+
+    def update(self, vehicle):
+        """Add or drop vehicle after it moved, if it entered or left the region."""
+        inside = self.is_in_region(vehicle)
+        counted = vehicle in self.route_of
+        if inside and not counted:
+            route_id = vehicle.route.id
+            self.routes.setdefault(route_id, set()).add(vehicle)
+            self.route_of[vehicle] = route_id
+        elif counted and not inside:
+            self.remove(vehicle)
+
+    def remove(self, vehicle):
+        route_id = self.route_of.pop(vehicle, None)
+        if route_id is not None:
+            self.routes[route_id].discard(vehicle)
+
+    def count(self, route_id):
+        members = self.routes.get(route_id)
+        return len(members) if members else 0
+
+    def any_on(self, route_ids):
+        """True if any of route_ids has a vehicle in the region."""
+        routes = self.routes
+        for route_id in route_ids:
+            if routes.get(route_id):
+                return True
+        return False
@@ -0,0 +1,118 @@
+# Origin -> destination routing over a RoadGraph. Paths are found with A*
+# on the sampled length of each edge (straight-line distance to the
+# destination never overestimates it), and every built Route is cached by
+# (origin, destination, route id) so repeated spawns share the same Route object.
+import heapq
+import math
+from itertools import count
+
+from classes.route.route_map import build_route, edge_to_points
+
+
+def edge_length(edge):
+    """Arc length of the points a route samples for edge."""
+    points = edge_to_points(edge)
+    return sum((b - a).length() for a, b in zip(points, points[1:]))
+
+
+def find_stop_node_index(graph, node_ids):
+    """Index of the node where the path enters its first intersection.
+
+    That is the end of its leading approach edges: nodes[2] for the
+    single-screen routes from a road end, nodes[1] for grid routes that
+    start at an approach node.
+    """
+    for i in range(len(node_ids) - 1):
+        if graph.get_edge(node_ids[i], node_ids[i + 1]).edge_type != "approach":
+            return i
+    return len(node_ids) - 1
+
+
+class Router:
+    def __init__(self, graph, stop_node_index=None):
+        self.graph = graph
+        # None finds it from each path's edges, which works for both the
+        # single intersection and grids (see find_stop_node_index)
+        self.stop_node_index = stop_node_index
+        self.graph_version = graph.version
+        # The sampled points only depend on the edge type and the offset
+        # between its ends, so every copy of an intersection shares lengths
+        self.edge_lengths = {}      # (type, dx, dy) -> length
+        self.routes = {}            # (origin, destination, route id) -> Route
+
+    def _check_graph(self):
+        # Any change to the graph can change lengths and shortest paths
+        if self.graph.version != self.graph_version:
+            self.clear()
+            self.graph_version = self.graph.version
+
+    def clear(self):
+        self.edge_lengths.clear()
+        self.routes.clear()
+
+    def get_edge_length(self, edge):
+        start = edge.start.position
+        end = edge.end.position
+        key = (edge.edge_type, end.x - start.x, end.y - start.y)
+        length = self.edge_lengths.get(key)
+        if length is None:
+            length = self.edge_lengths[key] = edge_length(edge)
+        return length
+
+    def shortest_path(self, origin, destination):
+        """Node ids from origin to destination along the shortest path, or None if unreachable."""
+        self._check_graph()
+        nodes = self.graph.nodes
+        adjacency = self.graph.adjacency
+        goal = nodes[destination].position
+
+        def heuristic(node_id):
+            pos = nodes[node_id].position
+            return math.hypot(goal.x - pos.x, goal.y - pos.y)
+
+        tie = count()
+        best = {origin: 0.0}
+        came_from = {}
+        frontier = [(heuristic(origin), next(tie), origin)]
+        closed = set()
+
+        while frontier:
+            _, _, node_id = heapq.heappop(frontier)
+            if node_id == destination:
+                path = [node_id]
+                while node_id in came_from:
+                    node_id = came_from[node_id]
+                    path.append(node_id)
+                path.reverse()
+                return path
+            if node_id in closed:
+                continue
+            closed.add(node_id)
+
+            cost = best[node_id]
+            for edge in adjacency[node_id]:
+                next_id = edge.end.id
+                new_cost = cost + self.get_edge_length(edge)
+                if new_cost < best.get(next_id, math.inf):
+                    best[next_id] = new_cost
+                    came_from[next_id] = node_id
+                    heapq.heappush(frontier, (new_cost + heuristic(next_id), next(tie), next_id))
+        return None
+
+    def get_route(self, origin, destination, route_id=None):
+        """Cached Route from origin to destination; raises ValueError if there is no path."""
+        self._check_graph()
+        if route_id is None:
+            route_id = f"{origin}->{destination}"
+        key = (origin, destination, route_id)
+        route = self.routes.get(key)
+        if route is None:
+            node_ids = self.shortest_path(origin, destination)
+            if node_ids is None:
+                raise ValueError(f"No path from node {origin} to node {destination}")
+            stop_node_index = self.stop_node_index
+            if stop_node_index is None:
+                stop_node_index = find_stop_node_index(self.graph, node_ids)
+            route = build_route(self.graph, route_id, node_ids, stop_node_index)
+            self.routes[key] = route
+        return route
@@ -0,0 +1,61 @@
+# Uniform grid spatial index so neighbour lookups only look at nearby cells
+# instead of scanning every vehicle in the simulation.
+
+class SpatialGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}         # (cx, cy) -> list of vehicles in that cell
+        self.cell_of = {}       # vehicle -> (cx, cy) it is currently stored in
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def clear(self):
+        self.cells.clear()
+        self.cell_of.clear()
+
+    def rebuild(self, vehicles):
+        """Re-bucket every vehicle from scratch (once per tick)."""
+        self.clear()
+        for vehicle in vehicles:
+            self.insert(vehicle)
+
+    def insert(self, vehicle):
+        cell = self._cell(vehicle.position.x, vehicle.position.y)
+        self.cells.setdefault(cell, []).append(vehicle)
+        self.cell_of[vehicle] = cell
+
+    def remove(self, vehicle):
+        cell = self.cell_of.pop(vehicle, None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        bucket.remove(vehicle)
+        if not bucket:
+            del self.cells[cell]
+
+    def move(self, vehicle):
+        """Keep the index exact after a vehicle has moved this tick."""
+        cell = self._cell(vehicle.position.x, vehicle.position.y)
+        if self.cell_of.get(vehicle) == cell:
+            return
+        self.remove(vehicle)
+        self.cells.setdefault(cell, []).append(vehicle)
+        self.cell_of[vehicle] = cell
+
+    def query_radius(self, pos, radius):
+        """
+        Return the vehicles stored in every cell overlapping the circle's
+        bounding box. This is a superset of the vehicles within radius, so
+        callers still do their own exact distance checks.
+        """
+        min_cx, min_cy = self._cell(pos[0] - radius, pos[1] - radius)
+        max_cx, max_cy = self._cell(pos[0] + radius, pos[1] + radius)
+
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        return found
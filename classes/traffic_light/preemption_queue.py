@@ -0,0 +1,33 @@
+# Ambulances waiting for signal priority, in the order they entered the
+# ambulance zone. Backed by an insertion-ordered dict, so entering,
+# leaving and membership checks are O(1) and the head is the oldest entry.
+
+class PreemptionQueue:
+    def __init__(self):
+        self.entries = {}       # vehicle -> None, in zone-entry order
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def __contains__(self, vehicle):
+        return vehicle in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def enter(self, vehicle):
+        # already queued: keep its place in line
+        self.entries.setdefault(vehicle, None)
+
+    def leave(self, vehicle):
+        self.entries.pop(vehicle, None)
+
+    def first(self):
+        """The ambulance with priority, or None when the queue is empty."""
+        return next(iter(self.entries), None)
+
+    def clear(self):
+        self.entries.clear()
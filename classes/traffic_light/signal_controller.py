@@ -0,0 +1,120 @@
+# Table-driven signal timing for any number of intersections. Each
+# intersection's cycle phase, the tick it started and the tick of its next
+# transition live in flat arrays, and a heap of transition ticks means a
+# tick with no transition due costs one comparison however many
+# intersections there are.
+import heapq
+from array import array
+
+from classes.traffic_light.light_state import LightState
+
+# (cycle phase, ticks it lasts), in cycle order
+PHASE_PLAN = (
+    (LightState.EW_GREEN, 120),
+    (LightState.EW_YELLOW, 80),
+    (LightState.EW_RED, 200),
+    (LightState.NS_GREEN, 120),
+    (LightState.NS_YELLOW, 80),
+    (LightState.NS_RED, 200),
+)
+
+# cycle phase -> (EW pair state, NS pair state)
+PHASE_STATES = {
+    LightState.EW_GREEN: (LightState.EW_GREEN, LightState.NS_RED),
+    LightState.EW_YELLOW: (LightState.EW_YELLOW, LightState.NS_RED),
+    LightState.EW_RED: (LightState.EW_RED, LightState.NS_GREEN),
+    LightState.NS_GREEN: (LightState.EW_RED, LightState.NS_GREEN),
+    LightState.NS_YELLOW: (LightState.EW_RED, LightState.NS_YELLOW),
+    LightState.NS_RED: (LightState.EW_GREEN, LightState.NS_RED),
+}
+
+
+class SignalController:
+    def __init__(self, plan=PHASE_PLAN):
+        self.states = [state for state, _ in plan]
+        self.durations = [duration for _, duration in plan]
+        self.phase_of = {state: i for i, state in enumerate(self.states)}
+
+        self.tick = 0
+        self.lights = []                    # per intersection, its lights in build_traffic_lights order
+        self.phase = array("b")             # index into the plan
+        self.phase_start = array("q")
+        self.next_transition = array("q")
+        self.transitions = []               # heap of (tick, intersection), stale entries are skipped
+        self.changed = []                   # intersections that changed phase on the last update
+        self.version = 0                    # bumped on every phase change
+
+    def __len__(self):
+        return len(self.lights)
+
+    def add_intersection(self, lights):
+        """Time the intersection whose lights are lights; its cycle starts from lights[0]'s state."""
+        index = len(self.lights)
+        self.lights.append(lights)
+        self.phase.append(self.phase_of[lights[0].state])
+        self.phase_start.append(self.tick)
+        self.next_transition.append(0)
+        self._schedule(index)
+        return index
+
+    def _schedule(self, index):
+        due = self.phase_start[index] + self.durations[self.phase[index]]
+        self.next_transition[index] = due
+        heapq.heappush(self.transitions, (due, index))
+
+    def state(self, index):
+        """Cycle phase of intersection index."""
+        return self.states[self.phase[index]]
+
+    def next_transition_tick(self):
+        """Tick of the earliest phase change still to come, or None with no intersections."""
+        transitions = self.transitions
+        while transitions and transitions[0][0] != self.next_transition[transitions[0][1]]:
+            heapq.heappop(transitions)
+        return transitions[0][0] if transitions else None
+
+    def update(self):
+        """Advance one tick and move every intersection whose transition is due to its next phase."""
+        self.tick += 1
+        changed = self.changed
+        changed.clear()
+        transitions = self.transitions
+        while transitions and transitions[0][0] <= self.tick:
+            due, index = heapq.heappop(transitions)
+            if due != self.next_transition[index]:
+                continue
+            self.phase[index] = (self.phase[index] + 1) % len(self.states)
+            self.phase_start[index] = self.tick
+            self._schedule(index)
+            changed.append(index)
+        if changed:
+            self.version += 1
+        return changed
+
+    def skip(self, ticks):
+        """Advance ticks ticks at once; no transition may fall inside them."""
+        due = self.next_transition_tick()
+        if due is not None and self.tick + ticks >= due:
+            raise ValueError(f"Can't skip {ticks} ticks past the transition at tick {due}")
+        self.tick += ticks
+
+    def force_phase(self, index, state):
+        """Put intersection index in phase state without restarting its phase time.
+
+        A phase that has already run longer than its new duration ends on
+        the next update, like a TrafficLight timer that kept counting.
+        """
+        phase = self.phase_of[state]
+        if phase != self.phase[index]:
+            self.phase[index] = phase
+            self._schedule(index)
+            self.version += 1
+
+    def show(self, index):
+        """Set the lights of intersection index to the display states of its phase."""
+        ew_state, ns_state = PHASE_STATES[self.states[self.phase[index]]]
+        lights = self.lights[index]
+        lights[0].state = ew_state
+        lights[1].state = ew_state
+        lights[2].state = ns_state
+        lights[3].state = ns_state
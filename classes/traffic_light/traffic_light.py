@@ -1,59 +1,28 @@
-import pygame
+from classes.geometry.vector import Vec2
 from classes.traffic_light.light_state import LightState
 
+# A light's state is set by the Simulation from its SignalController
+# (classes/traffic_light/signal_controller.py), which owns the timing.
 class TrafficLight:
     def __init__(self, pos, initial_state, id):
         self.pos = pos
         self.state = initial_state
-        self.timer = 0.0
         self.id = id
 
-        self.green_time = 120.0
-        self.yellow_time = 80.0
-        self.red_time = 200.0
 
-    def update(self):
-        self.timer += 1
-
-        if self.state in (LightState.NS_GREEN, LightState.EW_GREEN):
-            if self.timer >= self.green_time:
-                self._advance()
-
-        elif self.state in (LightState.NS_YELLOW, LightState.EW_YELLOW):
-            if self.timer >= self.yellow_time:
-                self._advance()
-
-        elif self.state in (LightState.NS_RED, LightState.EW_RED):
-            if self.timer >= self.red_time:
-                self._advance()
-
-    def _advance(self):
-        self.timer = 0.0
-
-        if self.state == LightState.NS_GREEN:
-            self.state = LightState.NS_YELLOW
-
-        elif self.state == LightState.NS_YELLOW:
-            self.state = LightState.NS_RED
-
-        elif self.state == LightState.NS_RED:
-            self.state = LightState.EW_GREEN
-
-        elif self.state == LightState.EW_GREEN:
-            self.state = LightState.EW_YELLOW
-
-        elif self.state == LightState.EW_YELLOW:
-            self.state = LightState.EW_RED
-
-        elif self.state == LightState.EW_RED:
-            self.state = LightState.NS_GREEN
-
-    def draw(self, screen):
-        if self.state in (LightState.NS_GREEN, LightState.EW_GREEN):
-            color = (0, 255, 0)
-        elif self.state in (LightState.NS_YELLOW, LightState.EW_YELLOW):
-            color = (255, 255, 0)
-        else:
-            color = (255, 0, 0)
-
-        pygame.draw.circle(screen, color, self.pos, 6)
+def build_traffic_lights(node_pos):
+    """The four lights of one intersection; node_pos maps its node ids (as in classes/graph/layout.py) to positions."""
+    traffic_lights = []
+    traffic_lights.append(
+        TrafficLight(Vec2(node_pos[3][0], node_pos[3][1]), LightState.EW_GREEN, 3)
+    )
+    traffic_lights.append(
+        TrafficLight(Vec2(node_pos[7][0], node_pos[7][1]), LightState.EW_GREEN, 0)
+    )
+    traffic_lights.append(
+        TrafficLight(Vec2(node_pos[1][0], node_pos[1][1]), LightState.NS_RED, 1)
+    )
+    traffic_lights.append(
+        TrafficLight(Vec2(node_pos[5][0], node_pos[5][1]), LightState.NS_RED, 2)
+    )
+    return traffic_lights
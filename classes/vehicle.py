@@ -1,6 +1,8 @@
-import math
-import pygame
+import time
+from classes.geometry.vector import Vec2
 from classes.traffic_light.light_state import LightState
+from classes.profiling.profiler import PROFILER
+from classes.vehicle_profile import get_profile
 # for zone
 SCREEN_WIDTH = 1000 
 SCREEN_HEIGHT = 800
@@ -8,6 +10,8 @@ AMBULANCE_ZONE_RADIUS = 300
 TRAFFIC_ZONE_RADIUS = 200
 ZONE_CENTER_X = SCREEN_WIDTH // 2
 ZONE_CENTER_Y = SCREEN_HEIGHT // 2
+AMBULANCE_ZONE_RADIUS_SQ = AMBULANCE_ZONE_RADIUS * AMBULANCE_ZONE_RADIUS
+TRAFFIC_ZONE_RADIUS_SQ = TRAFFIC_ZONE_RADIUS * TRAFFIC_ZONE_RADIUS
 
 LEFT_TURN_OPPOSING = {
     "N_left": ["S_straight", "S_right"],  # North left yields to South straight/right
@@ -16,123 +20,109 @@ LEFT_TURN_OPPOSING = {
     "W_left": ["E_straight", "E_right"],  # West left yields to East straight/right
 }
 
+# Grid routes are "row,col:N_left" and yield only within their own intersection
+_OPPOSING_CACHE = {}
+
+def opposing_routes(route_id):
+    """Ids of the routes a left turn on route_id yields to, () if it is not a left turn."""
+    opposing = _OPPOSING_CACHE.get(route_id)
+    if opposing is None:
+        prefix, sep, movement = route_id.rpartition(":")
+        opposing = tuple(prefix + sep + other for other in LEFT_TURN_OPPOSING.get(movement, ()))
+        _OPPOSING_CACHE[route_id] = opposing
+    return opposing
+
 LEFT_TURN_WAIT_NODE_INDEX = 2  # nodes[2] is the left-turn lane node (24, 25, 26, 27)
 
 class Vehicle:
+    __slots__ = (
+        "route", "current_index", "distance", "type", "profile", "finished", "traffic_light",
+        "position", "max_speed", "speed", "angle",
+        "is_left_turn", "opposing_routes", "left_turn_wait_position",
+        "left_turn_wait_path_index", "left_turn_wait_distance", "waiting_at_left_turn",
+        "lane", "lane_index", "lane_progress", "lane_shared", "leader", "follower",
+        "isInAmbulanceZone", "isInTrafficZone",
+        "sprite_rect",
+    )
+
     def __init__(self, route, speed, type: str, traffic_light):
+        self.position = None
+        # owned by the renderer (classes/render/pygame_renderer.py), never used by the physics
+        self.sprite_rect = None
+        self.reset(route, speed, type, traffic_light)
+
+    def reset(self, route, speed, type: str, traffic_light):
+        """Start a new trip. Recycled vehicles keep their position vector and sprite rect."""
         self.route = route
-        self.current_index = 0
+        self.current_index = 0      # path segment the vehicle is on
+        self.distance = 0.0         # arc length travelled along route.path
         self.type = type
+        self.profile = get_profile(type)    # constants shared by every vehicle of this type
         self.finished = False
         self.traffic_light = traffic_light
 
-        self.position = route.nodes[0].position.copy()
+        if self.position is None:
+            self.position = route.nodes[0].position.copy()
+        else:
+            self.position.update(route.nodes[0].position)
         self.max_speed = speed
         self.speed = speed
 
         # Initialize angle based on starting direction
-        if len(route.path) >= 2:
-            start = route.path[0]
-            next_pt = route.path[1]
-            direction = next_pt - start
-            if direction.length() > 0:
-                self.angle = math.degrees(math.atan2(-direction.y, direction.x)) - 90
-            else:
-                self.angle = 0
+        if route.segment_lengths and route.segment_lengths[0] > 0:
+            self.angle = route.segment_headings[0]
         else:
             self.angle = 0
 
-        # spacing / safety
-        self.LANE_WIDTH = 7
-        self.STOP_GAP = 25
-        self.SAFE_GAP = 50
-        self.MIN_SPEED = 0.15
-
         # Left turn yielding
-        self.LEFT_TURN_YIELD_DISTANCE = 180 
-        self.is_left_turn = route.id in LEFT_TURN_OPPOSING
-        self.opposing_routes = LEFT_TURN_OPPOSING.get(route.id, [])
+        self.opposing_routes = opposing_routes(route.id)
+        self.is_left_turn = bool(self.opposing_routes)
         
+        # shared with the route, never modified
         self.left_turn_wait_position = None
         if self.is_left_turn and len(route.nodes) > LEFT_TURN_WAIT_NODE_INDEX:
-            self.left_turn_wait_position = route.nodes[LEFT_TURN_WAIT_NODE_INDEX].position.copy()
+            self.left_turn_wait_position = route.nodes[LEFT_TURN_WAIT_NODE_INDEX].position
       
-        self.left_turn_wait_path_index = self._find_left_turn_wait_index()
+        self.left_turn_wait_path_index = -1
+        self.left_turn_wait_distance = float("inf")
+        if self.left_turn_wait_position is not None:
+            self.left_turn_wait_path_index = route.left_turn_wait_index
+            self.left_turn_wait_distance = route.cum_lengths[route.left_turn_wait_index]
         
         # Track if we're waiting at the left turn point
         self.waiting_at_left_turn = False
 
+        # lane links, kept up to date by LaneOccupancy when it is in use
+        self.lane = None
+        self.lane_index = 0
+        self.lane_progress = None
+        self.lane_shared = False    # lane branches or merges, see LaneOccupancy
+        self.leader = None
+        self.follower = None
+
         # zone
         self.isInAmbulanceZone = False
         self.isInTrafficZone = False
 
-        self.original_image = pygame.image.load(
-            f"assets/{type}.png"
-        ).convert_alpha()
+    def update_zones(self):
+        """Refresh both zone flags from one squared distance to the zone centre."""
+        dx = self.position.x - ZONE_CENTER_X
+        dy = self.position.y - ZONE_CENTER_Y
+        dist_sq = dx * dx + dy * dy
+        self.isInAmbulanceZone = dist_sq < AMBULANCE_ZONE_RADIUS_SQ
+        self.isInTrafficZone = dist_sq < TRAFFIC_ZONE_RADIUS_SQ
 
-        # Ambulance siren
-        if self.type == "ambulance":
-            self.siren_image = pygame.image.load("assets/siren.png").convert_alpha()
-            self.siren_timer = 0.0
-            self.siren_on = True
-            self.siren_offset = pygame.Vector2(0, 5)
-            
-        # # Apply initial rotation to match starting direction
-        self.image = pygame.transform.rotate(self.original_image, self.angle)
-        self.rect = self.image.get_rect(center=self.position)
-    
-    def _find_left_turn_wait_index(self):
-        """Find the path index closest to the left-turn lane node (nodes[2])"""
-        if not self.is_left_turn or len(self.route.nodes) < 3:
-            return -1
-        
-        wait_node_pos = self.route.nodes[LEFT_TURN_WAIT_NODE_INDEX].position
-        min_dist = float("inf")
-        closest_index = -1
-        
-        for i, pos in enumerate(self.route.path):
-            dist = (pos - wait_node_pos).length()
-            if dist < min_dist:
-                min_dist = dist
-                closest_index = i
-        
-        return closest_index
-    
-    def _get_node_path_index(self, node_index):
-        """Find the path index closest to the given route node index."""
-        if node_index >= len(self.route.nodes):
-            return len(self.route.path) - 1
-        
-        node_pos = self.route.nodes[node_index].position
-        min_dist = float("inf")
-        closest_index = -1
-        
-        for i, pos in enumerate(self.route.path):
-            dist = (pos - node_pos).length()
-            if dist < min_dist:
-                min_dist = dist
-                closest_index = i
-        
-        return closest_index
-
-
-    def point_in_ambulance_zone(self, x, y):
-      self.isInAmbulanceZone = False
-      distance = math.hypot(x - ZONE_CENTER_X, y - ZONE_CENTER_Y)
-      if distance < AMBULANCE_ZONE_RADIUS:
-          self.isInAmbulanceZone = True
-
-    def point_in_traffic_zone(self, x, y):
-      self.isInTrafficZone = False
-      distance = math.hypot(x - ZONE_CENTER_X, y - ZONE_CENTER_Y)
-      if distance < TRAFFIC_ZONE_RADIUS:
-          self.isInTrafficZone = True
-
-    def has_opposing_traffic(self, vehicles):
+    def has_opposing_traffic(self, vehicles, grid=None, occupancy=None):
         if not self.is_left_turn:
             return False
+
+        # The simulation keeps per-route counts of the vehicles we yield to
+        if occupancy is not None:
+            return occupancy.any_on(self.opposing_routes)
       
-        intersection_center = pygame.Vector2(ZONE_CENTER_X, ZONE_CENTER_Y)
+        intersection_center = Vec2(ZONE_CENTER_X, ZONE_CENTER_Y)
+        if grid is not None:
+            vehicles = grid.query_radius(intersection_center, self.profile.left_turn_yield_distance)
         
         for other in vehicles:
             if other is self or other.finished:
@@ -142,9 +132,9 @@ class Vehicle:
                 continue
             other_dist_to_center = (other.position - intersection_center).length()
             
-            if other_dist_to_center < self.LEFT_TURN_YIELD_DISTANCE:
-                remaining_path = len(other.route.path) - other.current_index
-                total_path = len(other.route.path)
+            if other_dist_to_center < self.profile.left_turn_yield_distance:
+                remaining_path = other.route.length - other.distance
+                total_path = other.route.length
                 
                 if remaining_path > total_path * 0.3:
                     return True
@@ -154,19 +144,39 @@ class Vehicle:
     def is_approaching_left_turn_wait(self):
         if not self.is_left_turn or self.left_turn_wait_position is None:
             return False
-        dist_to_wait = (self.position - self.left_turn_wait_position).length()
-        return (self.current_index < self.left_turn_wait_path_index and dist_to_wait < 100)
+        dist_to_wait = self.left_turn_wait_distance - self.distance
+        return 0 < dist_to_wait < 100
     
     def is_at_left_turn_wait(self):
         if not self.is_left_turn or self.left_turn_wait_position is None:
             return False
         
-        dist_to_wait = (self.position - self.left_turn_wait_position).length()
-        return dist_to_wait < 5  # Within 5 pixels of the wait position
-
-    def get_nearest_vehicle_ahead(self, vehicles, forward):
-        left = pygame.Vector2(-forward.y, forward.x)
+        dist_to_wait = self.left_turn_wait_distance - self.distance
+        return abs(dist_to_wait) < 5  # Within 5 pixels of the wait position
+
+    def get_lane_position(self):
+        """Return (edge index in route, arc length travelled along that edge)."""
+        edge_index = self.route.get_edge_index(self.current_index)
+        edge_start = self.route.cum_lengths[self.route.edge_offsets[edge_index]]
+        return edge_index, self.distance - edge_start
+
+    def get_leader_distance(self):
+        leader = self.leader
+        if leader is None or leader.finished:
+            return float("inf")
+        return (leader.position - self.position).length()
+
+    def get_nearest_vehicle_ahead(self, vehicles, forward, grid=None):
+        # With lane links the leader is already known, no search needed,
+        # except where other lanes branch off or merge in
+        if self.lane is not None and not self.lane_shared:
+            return self.get_leader_distance()
+
+        left = Vec2(-forward.y, forward.x)
+        lane_width = self.profile.lane_width
         nearest_dist = float("inf")
+        if grid is not None:
+            vehicles = grid.query_radius(self.position, self.profile.lookahead_distance)
         
         for other in vehicles:
             if other is self or other.finished:
@@ -182,7 +192,7 @@ class Vehicle:
                 continue
             
             side_dist = abs(to_other.dot(left))
-            if side_dist > self.LANE_WIDTH:
+            if side_dist > lane_width:
                 continue
             
             if d < nearest_dist:
@@ -190,212 +200,103 @@ class Vehicle:
         
         return nearest_dist
 
-    def update(self, vehicles):
-        if self.finished:
+    def get_following_speed(self, nearest_dist, speed):
+        """Speed allowed behind the vehicle ahead, given the speed we would drive on an empty road."""
+        profile = self.profile
+        buffer = 5
+        stop_dist = profile.stop_gap + buffer
+        safe_dist = profile.safe_gap + buffer
+
+        # Stop if there's a vehicle too close ahead
+        if nearest_dist < stop_dist:
+            return 0.0
+        # Slow down when approaching another vehicle
+        if nearest_dist < safe_dist:
+            t = (nearest_dist - stop_dist) / (safe_dist - stop_dist)
+            return max(profile.min_speed, self.max_speed * t)
+        return speed
+
+    def update(self, vehicles, grid=None, occupancy=None):
+        if not PROFILER.enabled:
+            self._update(vehicles, grid, occupancy)
             return
+        started = time.perf_counter()
+        branch = self._update(vehicles, grid, occupancy)
+        if branch is not None:
+            PROFILER.record(branch, time.perf_counter() - started)
 
-        if self.current_index >= len(self.route.path) - 1:
+    def _update(self, vehicles, grid, occupancy):
+        """Move one tick. Returns the profiler phase of the branch taken (None if nothing ran)."""
+        if self.finished:
+            return None
+
+        if self.distance >= self.route.length:
             self.finished = True
-            return
-        
+            return None
 
-        
-        if self.get_traffic_light_state() in (LightState.NS_RED, LightState.EW_RED):
-            if self.is_facing_target(self.position, self.angle, self.traffic_light.pos):
-                stop_position = self.route.nodes[2].position
-                dist_to_stop = (self.position - stop_position).length()
-                
+        forward = self.route.segment_directions[self.current_index]
+        is_red = self.get_traffic_light_state() in (LightState.NS_RED, LightState.EW_RED)
+
+        if is_red:
+            dist_to_stop = self.route.stop_distance - self.distance
+
+            # Only vehicles still before the stop line are held by it
+            if 0 <= dist_to_stop < 80:
                 # If at stop position, stay stopped
                 if dist_to_stop < 10:
-                    return
-                
-                if dist_to_stop < 80 and self.current_index <= self._get_node_path_index(2):
-                    move_vec = stop_position - self.position
-                    if move_vec.length() > 0:
-                        forward = move_vec.normalize()
-                        
-                        # Check for vehicles ahead - don't overlap!
-                        nearest_dist = self.get_nearest_vehicle_ahead(vehicles, forward)
-                        buffer = 5
-                        stop_gap = self.STOP_GAP + buffer
-                        
-                        # Calculate how far we can move
-                        move_dist = min(self.max_speed, dist_to_stop - 5)
-                        
-                        # Stop if there's a vehicle too close ahead
-                        if nearest_dist < stop_gap:
-                            move_dist = 0
-                        elif nearest_dist < self.SAFE_GAP + buffer:
-                            # Slow down when approaching another vehicle
-                            t = (nearest_dist - stop_gap) / (self.SAFE_GAP - self.STOP_GAP)
-                            move_dist = min(move_dist, max(self.MIN_SPEED, self.max_speed * t))
-                        
-                        if move_dist > 0:
-                            self.position += forward * move_dist
-                            self.rect.center = self.position
-                            # Update angle
-                            target_angle = math.degrees(math.atan2(-forward.y, forward.x)) - 90
-                            diff = (target_angle - self.angle + 180) % 360 - 180
-                            self.angle += diff * 0.2
-                            self.image = pygame.transform.rotate(self.original_image, self.angle)
-                            self.rect = self.image.get_rect(center=self.rect.center)
-                    self.point_in_ambulance_zone(self.position.x, self.position.y)
-                    self.point_in_traffic_zone(self.position.x, self.position.y)
-                    return
-
-        if self.is_left_turn and self.left_turn_wait_position is not None and self.type != "ambulance":
+                    return "vehicle.red_light_stop"
+
+                # Check for vehicles ahead - don't overlap!
+                nearest_dist = self.get_nearest_vehicle_ahead(vehicles, forward, grid)
+                speed = self.get_following_speed(nearest_dist, self.max_speed)
+                self.advance(min(speed, dist_to_stop - 5))
+                return "vehicle.red_light_stop"
+
+        if self.is_left_turn and self.left_turn_wait_position is not None and self.profile.yields_on_left_turn:
             if self.is_at_left_turn_wait():
-                if self.has_opposing_traffic(vehicles):
+                if self.has_opposing_traffic(vehicles, grid, occupancy):
                     # Stay at the wait position
                     self.waiting_at_left_turn = True
-                    self.point_in_ambulance_zone(self.position.x, self.position.y)
-                    self.point_in_traffic_zone(self.position.x, self.position.y)
-                    return
+                    self.update_zones()
+                    return "vehicle.left_turn_wait"
                 else:
                     # Clear to proceed
                     self.waiting_at_left_turn = False
             
-            elif self.is_approaching_left_turn_wait() and self.has_opposing_traffic(vehicles):
-                move_vec = self.left_turn_wait_position - self.position
-                distance = move_vec.length()
-                
-                if distance > 0:
-                    forward = move_vec.normalize()
-                    
-                    # Check for vehicles ahead - don't overlap!
-                    nearest_dist = self.get_nearest_vehicle_ahead(vehicles, forward)
-                    buffer = 5
-                    stop_gap = self.STOP_GAP + buffer
-                    
-                    # Calculate how far we can move
-                    move_dist = self.max_speed
-                    
-                    # Stop if there's a vehicle too close ahead
-                    if nearest_dist < stop_gap:
-                        move_dist = 0
-                    elif nearest_dist < self.SAFE_GAP + buffer:
-                        # Slow down when approaching another vehicle
-                        t = (nearest_dist - stop_gap) / (self.SAFE_GAP - self.STOP_GAP)
-                        move_dist = max(self.MIN_SPEED, self.max_speed * t)
-                    
-                    if distance <= move_dist and move_dist > 0:
-                        # Snap to the wait position
-                        self.position = self.left_turn_wait_position.copy()
-                        self.current_index = self.left_turn_wait_path_index
-                        self.waiting_at_left_turn = True
-                    elif move_dist > 0:
-                        self.position += forward * move_dist
-                    
-                    self.rect.center = self.position
-                    self.point_in_ambulance_zone(self.position.x, self.position.y)
-                    self.point_in_traffic_zone(self.position.x, self.position.y)
-                    
-                    target_angle = math.degrees(math.atan2(-forward.y, forward.x)) - 90
-                    diff = (target_angle - self.angle + 180) % 360 - 180
-                    self.angle += diff * 0.2
-                    self.image = pygame.transform.rotate(self.original_image, self.angle)
-                    self.rect = self.image.get_rect(center=self.rect.center)
-                return
-
-        target = self.route.path[self.current_index + 1]
-
-        move_vec = target - self.position
-        distance = move_vec.length()
-
-        if distance == 0:
-            return
-
-        forward = move_vec.normalize()
-        left = pygame.Vector2(-forward.y, forward.x)
-
-        nearest_dist = float("inf")
-        for other in vehicles:
-            if other is self or other.finished:
-                continue
-
-
-            to_other = other.position - self.position
-            d = to_other.length()
-
-            if d == 0:
-                continue
-
-            if forward.dot(to_other) <= 0:
-                continue
-
-            side_dist = abs(to_other.dot(left))
-            if side_dist > self.LANE_WIDTH:
-                continue
-
-            if d < nearest_dist:
-                nearest_dist = d
+            elif self.is_approaching_left_turn_wait() and self.has_opposing_traffic(vehicles, grid, occupancy):
+                # Check for vehicles ahead - don't overlap!
+                nearest_dist = self.get_nearest_vehicle_ahead(vehicles, forward, grid)
+                speed = self.get_following_speed(nearest_dist, self.max_speed)
+
+                dist_to_wait = self.left_turn_wait_distance - self.distance
+                if 0 < dist_to_wait <= speed:
+                    # Snap to the wait position
+                    speed = dist_to_wait
+                    self.waiting_at_left_turn = True
+                self.advance(speed)
+                return "vehicle.left_turn_wait"
 
         speed_now = self.max_speed
 
+        if is_red and self.current_index < self.route.stop_index and self.isInTrafficZone:
+            speed_now = self.max_speed * 0.5
 
-        if self.get_traffic_light_state() in (LightState.NS_RED, LightState.EW_RED):
-                if self.is_facing_target(self.position, self.angle, self.traffic_light.pos):
-                    if self.current_index < 2 and self.isInTrafficZone:
-                        speed_now = self.max_speed * 0.5
-
-        buffer = 5
-        stop_dist = self.STOP_GAP + buffer
-        safe_dist = self.SAFE_GAP + buffer
-
-        if nearest_dist < stop_dist:
-            speed_now = 0.0
-        elif nearest_dist < safe_dist:
-            t = (nearest_dist - stop_dist) / (safe_dist - stop_dist)
-            speed_now = max(self.MIN_SPEED, self.max_speed * t)
-
-        if distance <= speed_now:
-            self.position = target.copy()
-            self.current_index += 1
-        else:
-            self.position += forward * speed_now
-
-        self.rect.center = self.position
+        nearest_dist = self.get_nearest_vehicle_ahead(vehicles, forward, grid)
+        self.advance(self.get_following_speed(nearest_dist, speed_now))
+        return "vehicle.free_driving"
 
-        self.point_in_ambulance_zone(self.position.x, self.position.y)
-        self.point_in_traffic_zone(self.position.x, self.position.y)
+    def advance(self, move_dist):
+        """Move move_dist along the route, however many path points that passes."""
+        self.distance = min(self.distance + max(0.0, move_dist), self.route.length)
+        self.current_index = self.route.get_segment_index(self.distance, self.current_index)
+        self.route.point_into(self.distance, self.position, self.current_index)
 
-        target_angle = math.degrees(math.atan2(-forward.y, forward.x)) - 90
+        self.update_zones()
 
+        # Ease the sprite toward the heading of the current path segment
+        target_angle = self.route.segment_headings[self.current_index]
         diff = (target_angle - self.angle + 180) % 360 - 180
         self.angle += diff * 0.2
 
-        self.image = pygame.transform.rotate(self.original_image, self.angle)
-        self.rect = self.image.get_rect(center=self.rect.center)
-
     def get_traffic_light_state(self):
         return self.traffic_light.state
-    
-    
-    def angle_to_target(self, from_pos, to_pos):
-        dx = to_pos.x - from_pos.x
-        dy = to_pos.y - from_pos.y
-        return math.degrees(math.atan2(-dy, dx))
-
-
-    def normalize_angle(self, angle):
-        """
-        Normalize angle to range [-180, 180)
-        """
-        return (angle + 180) % 360 - 180
-
-
-    def is_facing_target(
-        self,
-        vehicle_pos,
-        vehicle_angle,   # sprite angle
-        target_pos,
-        tolerance_deg=20
-    ):
-        target_angle = self.angle_to_target(vehicle_pos, target_pos)
-
-        # Convert sprite rotation → true heading
-        heading = vehicle_angle + 90
-
-        diff = self.normalize_angle(target_angle - heading)
-
-        return abs(diff) <= tolerance_deg
@@ -0,0 +1,35 @@
+# Recycles finished vehicles for new spawns, so long runs with continuous
+# spawning reuse Vehicle objects (and their position vector and sprite rect)
+# instead of allocating new ones for every trip.
+from classes.vehicle import Vehicle
+
+MAX_POOLED_VEHICLES = 1024
+
+
+class VehiclePool:
+    def __init__(self, max_size=MAX_POOLED_VEHICLES):
+        self.max_size = max_size
+        self.free = []          # finished vehicles ready to be reused
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self):
+        return len(self.free)
+
+    def acquire(self, route, speed, type: str, traffic_light):
+        """A vehicle starting route, recycled when one is available."""
+        if self.free:
+            vehicle = self.free.pop()
+            vehicle.reset(route, speed, type, traffic_light)
+            self.reused += 1
+            return vehicle
+        self.created += 1
+        return Vehicle(route, speed, type, traffic_light)
+
+    def release(self, vehicle):
+        # Past max_size vehicles are simply dropped
+        if len(self.free) < self.max_size:
+            self.free.append(vehicle)
+
+    def clear(self):
+        self.free.clear()
@@ -0,0 +1,40 @@
+# Per-type vehicle settings. Every vehicle of a type points at the same
+# profile, so constants are stored once per type rather than once per vehicle.
+
+class VehicleProfile:
+    __slots__ = (
+        "name", "asset", "lane_width", "stop_gap", "safe_gap", "min_speed",
+        "lookahead_distance", "left_turn_yield_distance", "yields_on_left_turn",
+        "siren_asset", "siren_offset",
+    )
+
+    def __init__(self, name, asset=None, lane_width=7, stop_gap=25, safe_gap=50, min_speed=0.15,
+                 left_turn_yield_distance=180, yields_on_left_turn=True,
+                 siren_asset=None, siren_offset=(0, 5)):
+        self.name = name
+        self.asset = asset or name          # sprite name in the asset registry
+        self.lane_width = lane_width
+        self.stop_gap = stop_gap
+        self.safe_gap = safe_gap
+        self.min_speed = min_speed
+        # vehicles farther ahead than this never change our speed
+        self.lookahead_distance = safe_gap + 5
+        self.left_turn_yield_distance = left_turn_yield_distance
+        self.yields_on_left_turn = yields_on_left_turn
+        self.siren_asset = siren_asset      # None for vehicles without a siren
+        self.siren_offset = siren_offset    # siren position relative to the sprite centre
+
+
+PROFILES = {
+    "car": VehicleProfile("car"),
+    # ambulances never wait for opposing traffic before turning left
+    "ambulance": VehicleProfile("ambulance", yields_on_left_turn=False, siren_asset="siren"),
+}
+
+
+def get_profile(vehicle_type):
+    """Profile for vehicle_type; unknown types get car defaults under their own name."""
+    profile = PROFILES.get(vehicle_type)
+    if profile is None:
+        profile = PROFILES[vehicle_type] = VehicleProfile(vehicle_type)
+    return profile
@@ -0,0 +1,153 @@
+# Runs every preset (plus seeded random variants of each, JSONL spawn traces
+# only as written) headless across a process pool. Results are streamed to
+# a JSONL file as runs finish and then rolled up into a single report.
+#
+#   python -m manager.batch_runner --presets presets --seeds 4 --workers 8 --out-dir batch_results
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+
+from classes.route.route_map import ROUTE_TO_TRAFFIC_LIGHT
+from manager.scenario import SPAWN_TRACE_SUFFIX, build_simulation
+
+RESULTS_FILE = "runs.jsonl"
+REPORT_FILE = "report.json"
+
+
+def make_variant(data, seed):
+    """Seed 0 is the preset as written; other seeds put each vehicle on a random route."""
+    if seed == 0:
+        return data
+    rng = random.Random(seed)
+    route_names = list(ROUTE_TO_TRAFFIC_LIGHT)
+    vehicles = []
+    for v in data["vehicles"]:
+        route_id = rng.choice(route_names)
+        vehicles.append(dict(v, route=route_id, traffic_light_index=ROUTE_TO_TRAFFIC_LIGHT[route_id]))
+    rng.shuffle(vehicles)
+    return dict(data, vehicles=vehicles)
+
+
+def run_job(job):
+    """Run one (scenario, seed) job in a worker and return its summary row."""
+    scenario, seed, engine, ticks = job
+    data = None
+    if not scenario.endswith(SPAWN_TRACE_SUFFIX):
+        with open(scenario, "r") as f:
+            data = make_variant(json.load(f), seed)
+
+    sim = build_simulation(scenario, engine, data=data)
+    results = sim.run(ticks)
+
+    ticks_run = results["ticks"]
+    return {
+        "scenario": os.path.basename(scenario),
+        "seed": seed,
+        "engine": engine,
+        "ticks": ticks_run,
+        "wall_time_sec": results["wall_time_sec"],
+        "ticks_per_sec": results["ticks_per_sec"],
+        "vehicles_spawned": results["vehicles_spawned"],
+        "vehicles_finished": results["vehicles_finished"],
+        "vehicles_remaining": results["vehicles_remaining"],
+        # finished vehicles per 1000 ticks
+        "throughput": 1000 * results["vehicles_finished"] / ticks_run if ticks_run else 0.0,
+        "ambulance_travel": results["travel_stats"].get("ambulance"),
+        "mean_ambulance_travel_ticks": results.get("mean_ambulance_travel_ticks"),
+        "mean_car_travel_ticks": results.get("mean_car_travel_ticks"),
+    }
+
+
+def mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def summarize(rows):
+    """Aggregate per scenario and over the whole batch."""
+    def rollup(group):
+        ambulance = [row["ambulance_travel"] for row in group if row["ambulance_travel"]]
+        ambulances = sum(stats["count"] for stats in ambulance)
+        return {
+            "runs": len(group),
+            "vehicles_finished": sum(row["vehicles_finished"] for row in group),
+            "vehicles_remaining": sum(row["vehicles_remaining"] for row in group),
+            "mean_throughput": mean([row["throughput"] for row in group]),
+            "mean_ticks_per_sec": mean([row["ticks_per_sec"] for row in group if row["ticks_per_sec"]]),
+            "mean_ambulance_travel_ticks": (
+                sum(stats["total"] for stats in ambulance) / ambulances if ambulances else None
+            ),
+            "max_ambulance_travel_ticks": max((stats["max"] for stats in ambulance), default=None),
+        }
+
+    by_scenario = {}
+    for row in rows:
+        by_scenario.setdefault(row["scenario"], []).append(row)
+
+    return {
+        "total": rollup(rows),
+        "scenarios": {name: rollup(group) for name, group in sorted(by_scenario.items())},
+    }
+
+
+def build_jobs(preset_dir, seeds, engine, ticks):
+    scenarios = [
+        os.path.join(preset_dir, file)
+        for file in sorted(os.listdir(preset_dir))
+        if file.endswith(".json") or file.endswith(SPAWN_TRACE_SUFFIX)
+    ]
+    # A spawn trace has no vehicle list to shuffle, so it only runs as written
+    return [
+        (scenario, seed, engine, ticks)
+        for scenario in scenarios
+        for seed in (range(1) if scenario.endswith(SPAWN_TRACE_SUFFIX) else range(seeds))
+    ]
+
+
+def run_batch(jobs, workers, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    rows = []
+    started = time.perf_counter()
+
+    with multiprocessing.Pool(workers) as pool, \
+            open(os.path.join(out_dir, RESULTS_FILE), "w") as results_file:
+        # Rows are written as soon as each run finishes, in completion order
+        for row in pool.imap_unordered(run_job, jobs):
+            rows.append(row)
+            results_file.write(json.dumps(row) + "\n")
+            results_file.flush()
+            print(
+                f"[{len(rows)}/{len(jobs)}] {row['scenario']} seed={row['seed']}: "
+                f"{row['ticks']} ticks, {row['vehicles_finished']}/{row['vehicles_spawned']} finished"
+            )
+
+    report = summarize(rows)
+    report["workers"] = workers
+    report["wall_time_sec"] = time.perf_counter() - started
+    with open(os.path.join(out_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run scenario presets headless in parallel")
+    parser.add_argument("--presets", type=str, default="presets", help="Directory of scenario JSON/JSONL files")
+    parser.add_argument("--seeds", type=int, default=1, help="Runs per preset; seed 0 is the preset itself")
+    parser.add_argument("--engine", choices=["vehicle", "numpy"], default="vehicle")
+    parser.add_argument("--ticks", type=int, default=3600, help="Tick limit per run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--out-dir", type=str, default="batch_results")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    jobs = build_jobs(args.presets, args.seeds, args.engine, args.ticks)
+    report = run_batch(jobs, args.workers, args.out_dir)
+    total = report["total"]
+    print(
+        f"{total['runs']} runs in {report['wall_time_sec']:.2f}s on {args.workers} workers, "
+        f"mean ambulance travel {total['mean_ambulance_travel_ticks']} ticks"
+    )
@@ -0,0 +1,200 @@
+# Benchmark of simulation and rendering cost against vehicle count.
+# Generates seeded scenarios spread over the 12 routes, then times
+# Simulation.step and the draw routines of the window separately.
+#
+#   python -m manager.benchmark --sizes 10 100 1000 10000 --out bench.json
+#   python -m manager.benchmark --baseline bench.json --out bench_new.json
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# Rendering goes to an offscreen dummy display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from classes.render.assets import ASSETS
+from classes.render.background import BackgroundCache
+from classes.render.text import FONTS
+from classes.route.route_map import ROUTE_TO_TRAFFIC_LIGHT
+from manager import window
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+AMBULANCE_SHARE = 0.05
+PERCENTILES = (50, 90, 99)
+
+# A size is flagged when its ticks/sec fall more than this far below the baseline
+REGRESSION_THRESHOLD = 0.15
+
+
+def make_scenario(count, seed=0):
+    """count vehicles on random routes, about 5% of them ambulances."""
+    rng = random.Random(seed)
+    route_names = list(ROUTE_TO_TRAFFIC_LIGHT)
+    vehicles = []
+    for i in range(count):
+        route_id = route_names[i % len(route_names)]
+        is_ambulance = rng.random() < AMBULANCE_SHARE
+        vehicles.append({
+            "type": "ambulance" if is_ambulance else "car",
+            "route": route_id,
+            "speed": 2 if is_ambulance else 3,
+            "traffic_light_index": ROUTE_TO_TRAFFIC_LIGHT[route_id],
+        })
+    rng.shuffle(vehicles)
+    return {"vehicles": vehicles}
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def timing_stats(samples):
+    """Summary of per-tick (or per-frame) times given in seconds, reported in ms."""
+    samples = sorted(samples)
+    total = sum(samples)
+    stats = {
+        "samples": len(samples),
+        "per_sec": len(samples) / total if total > 0 else None,
+        "mean_ms": 1000 * total / len(samples) if samples else None,
+        "max_ms": 1000 * samples[-1] if samples else None,
+    }
+    for p in PERCENTILES:
+        value = percentile(samples, p)
+        stats[f"p{p}_ms"] = 1000 * value if value is not None else None
+    return stats
+
+
+def bench_simulation(count, engine, ticks, warmup, seed):
+    sim = window.build_simulation(f"<generated:{count}>", engine, data=make_scenario(count, seed))
+    for _ in range(warmup):
+        sim.step()
+
+    samples = []
+    clock = time.perf_counter
+    for _ in range(ticks):
+        started = clock()
+        sim.step()
+        samples.append(clock() - started)
+    return timing_stats(samples), sim
+
+
+def bench_render(screen, font, sim, frames, show_lines=True):
+    """Time one full frame of drawing (no simulation step, no flip) at the current state."""
+    background = BackgroundCache(
+        lambda surface, graph, show_lines: window.draw_background(surface, graph, font, show_lines)
+    )
+    background.get(sim.graph, screen.get_size(), show_lines)
+    sim.sync_views()
+    stats_panel = window.VehicleStatsPanel()
+
+    samples = []
+    clock = time.perf_counter
+    for _ in range(frames):
+        started = clock()
+        background.blit(screen, sim.graph, show_lines)
+        stats_panel.draw(screen, sim.vehicles)
+        window.draw_traffic(screen, sim.traffic_lights, sim.vehicles, sim.ambulance_in_zone, show_lines)
+        samples.append(clock() - started)
+    return timing_stats(samples)
+
+
+def run_benchmarks(sizes, engines, ticks, warmup, frames, seed):
+    pygame.init()
+    screen = pygame.display.set_mode((window.SCREEN_WIDTH, window.SCREEN_HEIGHT))
+    font = FONTS.get(None, 24)
+    ASSETS.preload()
+
+    results = []
+    for engine in engines:
+        for count in sizes:
+            sim_stats, sim = bench_simulation(count, engine, ticks, warmup, seed)
+            render_stats = bench_render(screen, font, sim, frames) if frames > 0 else None
+            results.append({
+                "engine": engine,
+                "vehicles": count,
+                "simulation": sim_stats,
+                "render": render_stats,
+            })
+            render_tps = render_stats["per_sec"] if render_stats else None
+            print(
+                f"{engine:>7} {count:>6} vehicles: sim {sim_stats['per_sec']:.1f} ticks/s "
+                f"(p99 {sim_stats['p99_ms']:.2f} ms)"
+                + (f", render {render_tps:.1f} frames/s (p99 {render_stats['p99_ms']:.2f} ms)" if render_stats else "")
+            )
+    pygame.quit()
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """List the (engine, size, kind) entries whose throughput dropped more than threshold."""
+    previous = {(r["engine"], r["vehicles"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["engine"], r["vehicles"]))
+        if old is None:
+            continue
+        for kind in ("simulation", "render"):
+            if not r.get(kind) or not old.get(kind):
+                continue
+            new_rate, old_rate = r[kind]["per_sec"], old[kind]["per_sec"]
+            if new_rate and old_rate and new_rate < old_rate * (1 - threshold):
+                regressions.append({
+                    "engine": r["engine"],
+                    "vehicles": r["vehicles"],
+                    "kind": kind,
+                    "baseline_per_sec": old_rate,
+                    "per_sec": new_rate,
+                    "ratio": new_rate / old_rate,
+                })
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark simulation and rendering against vehicle count")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Vehicle counts to run")
+    parser.add_argument("--engines", nargs="+", choices=["vehicle", "numpy"], default=["vehicle"])
+    parser.add_argument("--ticks", type=int, default=200, help="Timed simulation ticks per size")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed ticks before measuring")
+    parser.add_argument("--frames", type=int, default=30, help="Timed render frames per size (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default=None, help="Write the results JSON to this path")
+    parser.add_argument("--baseline", type=str, default=None, help="Earlier results JSON to check against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmarks(args.sizes, args.engines, args.ticks, args.warmup, args.frames, args.seed)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": results,
+    }
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            report["regressions"] = compare(results, json.load(f))
+        for reg in report["regressions"]:
+            print(
+                f"REGRESSION {reg['engine']} {reg['vehicles']} vehicles {reg['kind']}: "
+                f"{reg['per_sec']:.1f}/s vs {reg['baseline_per_sec']:.1f}/s"
+            )
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if report.get("regressions"):
+        sys.exit(1)
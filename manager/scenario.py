@@ -0,0 +1,96 @@
+# Scenario loading and simulation setup, without pygame. The window
+# (manager/window.py), the headless runs and the batch workers all build
+# their Simulation here; only the window also imports the renderer.
+import json
+
+from classes.graph.graph import RoadGraph
+from classes.graph.layout import build_node_positions
+from classes.route.route_map import ROUTE_TO_TRAFFIC_LIGHT, build_routes
+from classes.traffic_light.traffic_light import build_traffic_lights
+from classes.vehicle import Vehicle
+from manager.simulation import Simulation
+
+# Scenarios with this suffix are streamed as timed spawns, one JSON object per line
+SPAWN_TRACE_SUFFIX = ".jsonl"
+
+
+def load_from_json(path, routes, traffic_lights):
+    with open(path, "r") as f:
+        data = json.load(f)
+    return load_vehicles(data, routes, traffic_lights)
+
+
+def load_vehicles(data, routes, traffic_lights):
+    """Build the vehicles of an already parsed scenario."""
+    vehicles = []
+    for v in data["vehicles"]:
+        route_id = v["route"]
+        speed = v["speed"]
+        vehicle_type = v.get("type")
+        traffic_light_index = v.get("traffic_light_index")
+
+        if route_id not in routes:
+            raise ValueError(f"Unknown route '{route_id}' in scenario file")
+
+        route = routes[route_id]
+        vehicles.append(Vehicle(route, speed, vehicle_type, traffic_lights[traffic_light_index]))
+
+    return vehicles
+
+
+def iter_spawns(path, routes, traffic_lights):
+    """Timed spawns of a JSONL trace, parsed one line at a time as the simulation asks for them.
+
+    Each line is {"tick", "route", "speed"} plus optional "type" (car) and
+    "traffic_light_index" (the route's own light). Yields
+    (tick, route, speed, type, traffic light) in tick order.
+    """
+    last_tick = 0
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            v = json.loads(line)
+            tick = v["tick"]
+            route_id = v["route"]
+
+            if route_id not in routes:
+                raise ValueError(f"{path}:{line_no}: unknown route '{route_id}'")
+            if tick < last_tick:
+                raise ValueError(f"{path}:{line_no}: tick {tick} comes after tick {last_tick}")
+            last_tick = tick
+
+            traffic_light_index = v.get("traffic_light_index")
+            if traffic_light_index is None:
+                traffic_light_index = ROUTE_TO_TRAFFIC_LIGHT[route_id]
+            yield tick, routes[route_id], v["speed"], v.get("type", "car"), traffic_lights[traffic_light_index]
+
+
+def load_scenario(path, routes, traffic_lights):
+    """(vehicles at the start, timed spawns or None) of a .json scenario or a .jsonl spawn trace."""
+    if path.endswith(SPAWN_TRACE_SUFFIX):
+        return [], iter_spawns(path, routes, traffic_lights)
+    return load_from_json(path, routes, traffic_lights), None
+
+
+def build_simulation(scenario, engine_name="vehicle", data=None, node_pos=None):
+    """Build the graph, routes, lights and traffic of a scenario file (or of data, if given)."""
+    if node_pos is None:
+        node_pos = build_node_positions()
+    graph = RoadGraph(node_pos)
+    traffic_lights = build_traffic_lights(node_pos)
+    routes = build_routes(graph)
+
+    engine = None
+    if engine_name == "numpy":
+        # numpy is only needed for this engine, so import it on demand
+        from classes.engine.numpy_engine import NumpyEngine
+        engine = NumpyEngine(graph, routes, traffic_lights)
+
+    spawns = None
+    if data is None:
+        vehicles, spawns = load_scenario(scenario, routes, traffic_lights)
+    else:
+        vehicles = load_vehicles(data, routes, traffic_lights)
+    return Simulation(graph, routes, traffic_lights, vehicles, engine, spawns)
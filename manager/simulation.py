@@ -0,0 +1,326 @@
+# One simulation tick, shared by the pygame window and headless runs:
+# vehicle movement, the ambulance preemption queue and traffic light sync.
+import time
+
+from classes.graph.lane_occupancy import LaneOccupancy
+from classes.profiling.profiler import PROFILER
+from classes.route.route_occupancy import RouteOccupancy
+from classes.spatial.spatial_grid import SpatialGrid
+from classes.traffic_light.light_state import LightState
+from classes.traffic_light.preemption_queue import PreemptionQueue
+from classes.traffic_light.signal_controller import SignalController
+from classes.vehicle import ZONE_CENTER_X, ZONE_CENTER_Y
+from classes.vehicle_profile import get_profile
+from classes.vehicle_pool import VehiclePool
+
+# Cell size of the neighbour grid, at least the vehicle look-ahead distance
+GRID_CELL_SIZE = 60
+
+ZONE_CENTER = (ZONE_CENTER_X, ZONE_CENTER_Y)
+
+# Lights per intersection, in build_traffic_lights order (EW, EW, NS, NS)
+LIGHTS_PER_INTERSECTION = 4
+
+
+class Simulation:
+    def __init__(self, graph, routes, traffic_lights, vehicles, engine=None, spawns=None):
+        self.graph = graph
+        self.routes = routes
+        self.traffic_lights = traffic_lights
+        self.engine = engine        # optional NumpyEngine doing the vehicle updates
+
+        self.grid = SpatialGrid(GRID_CELL_SIZE)
+        self.lanes = LaneOccupancy(graph)
+        # vehicles left turns yield to, per route; only one radius can be
+        # counted, so it is the one of the car profile every yielding type shares
+        self.yield_occupancy = RouteOccupancy(ZONE_CENTER, get_profile("car").left_turn_yield_distance)
+
+        self.tick = 0
+        self.vehicles = []
+        self.pool = VehiclePool()   # finished vehicles, recycled by spawn()
+        self.ambulance_queue = PreemptionQueue()
+        self.zone_events = []       # (ambulance, entered) ambulance zone crossings this tick
+        self.ambulance_in_zone = False
+
+        # Phase timing of every intersection; traffic_lights[0] is the master
+        # light of the first one, which the ambulance zone surrounds
+        self.signals = SignalController()
+        for start in range(0, len(traffic_lights), LIGHTS_PER_INTERSECTION):
+            self.signals.add_intersection(traffic_lights[start:start + LIGHTS_PER_INTERSECTION])
+
+        # Timed spawns (tick, route, speed, vehicle type, traffic light) in tick
+        # order, read one ahead so a long trace is never held in memory
+        self.spawns = None
+        self.next_spawn = None
+        self.spawn_offset = 0       # sim tick the spawn ticks count from
+
+        # Headless runs jump over ticks that can't change anything (see run())
+        self.fast_forward = True
+        self.quiescent = False      # the last tick changed nothing, nor will the next ones until an event
+        self.vehicles_changed = False
+        self.skipped_ticks = 0
+
+        self.spawn_tick = {}        # vehicle -> tick it was added
+        self.travel_stats = {}      # vehicle type -> {"count", "total", "max"} travel ticks of finished vehicles
+        self.spawned = 0
+        self.finished = 0
+        self.wall_time = 0.0
+
+        self.reset(vehicles, spawns)
+
+    def reset(self, vehicles, spawns=None):
+        self.vehicles = []
+        self.quiescent = False
+        self.ambulance_queue.clear()
+        self.zone_events.clear()
+        self.lanes.clear()
+        self.yield_occupancy.clear()
+        self.spawn_tick.clear()
+        if self.engine is not None:
+            self.engine.clear()
+        for vehicle in vehicles:
+            self.add_vehicle(vehicle)
+        self.set_spawns(spawns)
+
+    def set_spawns(self, spawns):
+        """Feed timed spawns from an iterable (or None for none); their ticks count from now."""
+        self.quiescent = False
+        self.spawns = iter(spawns) if spawns is not None else None
+        self.next_spawn = next(self.spawns, None) if self.spawns is not None else None
+        self.spawn_offset = self.tick
+        self._release_spawns()
+
+    def _release_spawns(self):
+        # Spawns due this tick join at its end and first move on the next one,
+        # like the vehicles a scenario starts with
+        due = self.tick - self.spawn_offset
+        spawn = self.next_spawn
+        while spawn is not None and spawn[0] <= due:
+            _, route, speed, vehicle_type, traffic_light = spawn
+            self.spawn(route, speed, vehicle_type, traffic_light)
+            spawn = next(self.spawns, None)
+        self.next_spawn = spawn
+
+    def add_vehicle(self, vehicle):
+        self.quiescent = False
+        self.vehicles.append(vehicle)
+        self.spawn_tick[vehicle] = self.tick
+        self.spawned += 1
+        if self.engine is not None:
+            self.engine.add(vehicle)
+        else:
+            self.yield_occupancy.update(vehicle)
+
+    def spawn(self, route, speed, vehicle_type, traffic_light):
+        """Add a vehicle for route, reusing a finished one when possible."""
+        vehicle = self.pool.acquire(route, speed, vehicle_type, traffic_light)
+        self.add_vehicle(vehicle)
+        return vehicle
+
+    def _record_finished(self, vehicle):
+        self.finished += 1
+        ticks = self.tick - self.spawn_tick.pop(vehicle, self.tick)
+        # running totals, so long traces don't keep one entry per vehicle
+        stats = self.travel_stats.get(vehicle.type)
+        if stats is None:
+            stats = self.travel_stats[vehicle.type] = {"count": 0, "total": 0, "max": 0}
+        stats["count"] += 1
+        stats["total"] += ticks
+        if ticks > stats["max"]:
+            stats["max"] = ticks
+
+    def step(self, advance=True):
+        """Run one tick. With advance=False (paused) only the lights are re-synced."""
+        if advance:
+            signals_version = self.signals.version
+            ambulance_in_zone = self.ambulance_in_zone
+            spawned = self.spawned
+
+            self.tick += 1
+            self._update_signals()
+            with PROFILER.phase("sim.vehicle_updates"):
+                self._update_vehicles()
+            if self.next_spawn is not None:
+                self._release_spawns()
+
+        with PROFILER.phase("sim.ambulance_queue"):
+            self._update_ambulance_queue()
+        with PROFILER.phase("sim.light_sync"):
+            self._sync_lights()
+
+        if advance:
+            # A tick is a pure function of the vehicles, the light phases and
+            # the preemption state, so when it left all of them as they were
+            # the ticks after it do the same until a transition or spawn is due
+            self.quiescent = (
+                not self.vehicles_changed
+                and self.spawned == spawned
+                and self.signals.version == signals_version
+                and self.ambulance_in_zone == ambulance_in_zone
+            )
+
+    def sync_views(self):
+        """Bring Vehicle positions and angles up to date before drawing them (engine runs only)."""
+        if self.engine is not None:
+            self.engine.sync_views()
+
+    def _update_signals(self):
+        self.signals.update()
+        # Lights are left in their display states after a tick; while vehicles
+        # move, the master light shows the cycle phase itself
+        self.traffic_lights[0].state = self.signals.state(0)
+
+    def _update_vehicles(self):
+        if self.engine is not None:
+            # Advance every vehicle at once; the views are only synced for drawing
+            self.engine.step()
+            self.zone_events.extend(self.engine.zone_events)
+            done = self.engine.remove_finished()
+            self.vehicles_changed = self.engine.changed or bool(done)
+            if done:
+                for vehicle in done:
+                    self.ambulance_queue.leave(vehicle)
+                    self._record_finished(vehicle)
+                    self.pool.release(vehicle)
+                self.vehicles = list(self.engine.vehicles)
+            return
+
+        # Index vehicle positions once per tick for neighbour queries; only
+        # Vehicle.update reads the grid, so the engine path never builds it
+        grid = self.grid
+        grid.rebuild(self.vehicles)
+
+        # Sort vehicles into their edges and link each one to its leader
+        self.lanes.update(self.vehicles)
+
+        # Update all vehicles
+        vehicles = self.vehicles
+        occupancy = self.yield_occupancy
+        zone_events = self.zone_events
+        retired = 0
+        changed = False
+        for vehicle in vehicles:
+            was_in_zone = vehicle.isInAmbulanceZone
+            distance = vehicle.distance
+            angle = vehicle.angle
+            waiting = vehicle.waiting_at_left_turn
+            vehicle.update(vehicles, grid, occupancy)
+            if vehicle.distance != distance or vehicle.angle != angle or vehicle.waiting_at_left_turn != waiting:
+                changed = True
+            if vehicle.isInAmbulanceZone != was_in_zone and vehicle.type == "ambulance":
+                zone_events.append((vehicle, vehicle.isInAmbulanceZone))
+            if vehicle.finished:
+                # Finished vehicles are skipped by everyone else, so they can
+                # stay in the list until it is compacted below
+                grid.remove(vehicle)
+                self.lanes.remove(vehicle)
+                occupancy.remove(vehicle)
+                self.ambulance_queue.leave(vehicle)
+                self._record_finished(vehicle)
+                retired += 1
+            else:
+                grid.move(vehicle)
+                occupancy.update(vehicle)
+
+        self.vehicles_changed = changed or retired > 0
+        if retired:
+            # One order-preserving pass instead of a list.remove per vehicle
+            pool = self.pool
+            kept = []
+            for vehicle in vehicles:
+                if vehicle.finished:
+                    pool.release(vehicle)
+                else:
+                    kept.append(vehicle)
+            vehicles[:] = kept
+
+    def _update_ambulance_queue(self):
+        # Only ambulances that crossed the zone edge this tick touch the queue
+        for vehicle, entered in self.zone_events:
+            if entered and not vehicle.finished:
+                self.ambulance_queue.enter(vehicle)
+            else:
+                self.ambulance_queue.leave(vehicle)
+        self.zone_events.clear()
+
+        # Check if any ambulance is in zone
+        self.ambulance_in_zone = bool(self.ambulance_queue)
+
+    def _sync_lights(self):
+        signals = self.signals
+
+        # Apply ambulance priority OR sync lights properly
+        if self.ambulance_in_zone:
+            priority_ambulance = self.ambulance_queue.first()
+            ambulance_tl_id = priority_ambulance.traffic_light.id
+            for tl in signals.lights[0]:
+                if tl.id == ambulance_tl_id:
+                    # Give green to ambulance's direction
+                    tl.state = LightState.NS_GREEN if tl.id in (1, 2) else LightState.EW_GREEN
+                else:
+                    # Give red to other directions
+                    tl.state = LightState.NS_RED if tl.id in (1, 2) else LightState.EW_RED
+            # The cycle carries on from the master light's priority state
+            signals.force_phase(0, self.traffic_lights[0].state)
+        else:
+            # Set ALL lights for display (including [0])
+            signals.show(0)
+
+        # Other intersections only change when their phase does
+        for index in signals.changed:
+            if index:
+                signals.show(index)
+
+    def next_event_tick(self):
+        """Tick of the next light transition or timed spawn, or None if neither is coming."""
+        events = []
+        transition = self.signals.next_transition_tick()
+        if transition is not None:
+            events.append(transition)
+        if self.next_spawn is not None:
+            events.append(self.next_spawn[0] + self.spawn_offset)
+        return min(events) if events else None
+
+    def skip_to(self, tick):
+        """Jump to tick without stepping; only valid while quiescent and before the next event."""
+        ticks = tick - self.tick
+        if ticks <= 0:
+            return
+        self.signals.skip(ticks)
+        self.tick = tick
+        self.skipped_ticks += ticks
+
+    def run(self, ticks):
+        """Step as fast as possible for up to ticks ticks, stopping once no vehicles are left or due.
+
+        With fast_forward, quiescent stretches are skipped up to the tick
+        before the next event, which then runs as a normal step, so the
+        results match stepping every tick.
+        """
+        started = time.perf_counter()
+        end = self.tick + ticks
+        while self.tick < end:
+            if not self.vehicles and self.next_spawn is None:
+                break
+            if self.fast_forward and self.quiescent:
+                event = self.next_event_tick()
+                self.skip_to((end if event is None else min(end, event)) - 1)
+            self.step()
+        self.wall_time = time.perf_counter() - started
+        return self.get_results()
+
+    def get_results(self):
+        wall_time = self.wall_time
+        results = {
+            "ticks": self.tick,
+            "wall_time_sec": wall_time,
+            "ticks_per_sec": self.tick / wall_time if wall_time > 0 else None,
+            "vehicles_spawned": self.spawned,
+            "vehicles_finished": self.finished,
+            "vehicles_remaining": len(self.vehicles),
+            "skipped_ticks": self.skipped_ticks,
+            "travel_stats": self.travel_stats,
+        }
+        for vehicle_type, stats in self.travel_stats.items():
+            results[f"mean_{vehicle_type}_travel_ticks"] = stats["total"] / stats["count"]
+        return results
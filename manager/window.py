@@ -0,0 +1,662 @@
+# The pygame window: drawing of the road scene, the UI widgets, the
+# per-vehicle stats panel and the interactive loop. main.py only imports
+# this module when a window is opened, so headless runs never load pygame.
+import pygame
+import math
+import random
+import time
+import pygame.gfxdraw as gfxdraw
+
+
+from classes.route.route_map import ROUTE_TO_TRAFFIC_LIGHT
+from classes.geometry.vector import Vec2
+from classes.graph import layout
+from classes.render.pygame_renderer import RENDERER
+from classes.render.assets import ASSETS
+from classes.render.background import BackgroundCache
+from classes.render.dirty_rects import DirtyRectRenderer
+from classes.render.text import FONTS, TEXT_CACHE
+from classes.profiling.profiler import PROFILER
+from manager import scenario as scenarios
+from manager.scenario import load_scenario
+
+SCREEN_WIDTH = 1000
+SCREEN_HEIGHT = 800
+
+
+class Button:
+    def __init__(self, x, y, width, height, text, color, hover_color, text_color=(255, 255, 255)):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.text = text
+        self.color = color
+        self.hover_color = hover_color
+        self.text_color = text_color
+        self.is_hovered = False
+        self.font = FONTS.get(None, 24)
+    
+    def draw(self, screen):
+        color = self.hover_color if self.is_hovered else self.color
+        pygame.draw.rect(screen, color, self.rect, border_radius=5)
+        pygame.draw.rect(screen, (255, 255, 255), self.rect, 2, border_radius=5)
+        
+        text_surface = TEXT_CACHE.render(self.font, self.text, self.text_color)
+        text_rect = text_surface.get_rect(center=self.rect.center)
+        screen.blit(text_surface, text_rect)
+        return self.rect.union(text_rect)
+    
+    def update(self, mouse_pos):
+        self.is_hovered = self.rect.collidepoint(mouse_pos)
+    
+    def is_clicked(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            return self.rect.collidepoint(event.pos)
+        return False
+
+
+def spawn_vehicle(vehicle_type, sim):
+    """Spawn a new vehicle on a random route."""
+    route_names = list(sim.routes.keys())
+    route_name = random.choice(route_names)
+    route = sim.routes[route_name]
+    traffic_light_index = ROUTE_TO_TRAFFIC_LIGHT[route_name]
+    speed = 2 if vehicle_type == "ambulance" else 3
+    return sim.spawn(route, speed, vehicle_type, sim.traffic_lights[traffic_light_index])
+
+
+# Global variable to hold node positions
+# dictionary of [int, Vec2]
+NODE_POS = None
+
+
+ROAD_COLOR = (50, 50, 50)
+BG_COLOR = (30, 30, 30)
+
+ROAD_THICKNESS = SCREEN_WIDTH // 10
+
+NODE_RADIUS = 4
+NODE_COLOR = (80, 160, 255)
+TEXT_COLOR = (255, 255, 255)
+YELLOW = (255, 200, 0)
+BLUE = (80, 160, 255)
+RED = (255, 80, 80)
+GREEN = (80, 255, 80)
+WHITE = (255, 255, 255)
+LINE_WIDTH = 2
+ZONE_COLOR = (255, 80, 80)
+AMBULANCE_ZONE_RADIUS = 300
+TRAFFIC_ZONE_RADIUS = 200
+ZONE_WIDTH = 2
+
+# The per-vehicle stats panel is re-rendered once every this many frames
+STATS_REFRESH_FRAMES = 10
+
+
+
+def build_node_positions():
+    return layout.build_node_positions(SCREEN_WIDTH, SCREEN_HEIGHT, ROAD_THICKNESS)
+
+
+# get position of node by its ID
+def getPos(node_id: int) -> Vec2:
+    return NODE_POS[node_id]
+
+
+def draw_nodes(screen, font):
+    # placeholder nodes for easier visualization for now
+    for node_id, pos in NODE_POS.items():
+        pygame.draw.circle(screen, NODE_COLOR, (int(pos.x), int(pos.y)), NODE_RADIUS)
+
+        # label = font.render(str(node_id), True, TEXT_COLOR)
+        # screen.blit(label, (int(pos.x) , int(pos.y)))
+        
+class VehicleStatsPanel:
+    """One line per vehicle, re-rendered only every refresh_every frames."""
+
+    def __init__(self, refresh_every=STATS_REFRESH_FRAMES):
+        self.refresh_every = max(1, refresh_every)
+        self.font = FONTS.get(None, 18)
+        self.lines = []         # rendered text surfaces from the last refresh
+        self.frame = 0
+
+    def refresh(self, vehicles):
+        self.lines = []
+        for i, v in enumerate(vehicles):
+            text_str = (
+                f"V{i} | {v.type} | "
+                f"Pos=({v.position.x:.1f},{v.position.y:.1f}) | "
+                f"Speed={v.speed:.2f} | "
+                f"Angle={v.angle:.1f}"
+            )
+            # positions change every refresh, so caching these would only churn TEXT_CACHE
+            self.lines.append(self.font.render(text_str, True, (255, 255, 255)))
+
+    def draw(self, screen, vehicles):
+        """Draw the panel, refreshing it first when due. Returns the rects drawn."""
+        if self.frame % self.refresh_every == 0:
+            self.refresh(vehicles)
+        self.frame += 1
+
+        line_height = 18
+        x = 560
+        y = 460
+
+        rects = []
+        for text in self.lines:
+            rects.append(screen.blit(text, (x, y)))
+            y += line_height
+        return rects
+
+
+
+
+
+def get_intersection_rect():
+    return pygame.Rect(
+        (SCREEN_WIDTH - ROAD_THICKNESS) // 2,
+        (SCREEN_HEIGHT - ROAD_THICKNESS) // 2,
+        ROAD_THICKNESS,
+        ROAD_THICKNESS
+    )
+
+
+def draw_roads(screen):
+    v_road = pygame.Rect(
+        (SCREEN_WIDTH - ROAD_THICKNESS) // 2,
+        0,
+        ROAD_THICKNESS,
+        SCREEN_HEIGHT
+    )
+    h_road = pygame.Rect(
+        0,
+        (SCREEN_HEIGHT - ROAD_THICKNESS) // 2,
+        SCREEN_WIDTH,
+        ROAD_THICKNESS
+    )
+
+    pygame.draw.rect(screen, ROAD_COLOR, v_road)
+    pygame.draw.rect(screen, ROAD_COLOR, h_road)
+
+    intersection = get_intersection_rect()
+
+    cx = SCREEN_WIDTH // 2
+    cy = SCREEN_HEIGHT // 2
+    stoplineLength = ROAD_THICKNESS // 2
+
+    offsetRoad = 1 * ROAD_THICKNESS // 8
+
+    draw_dashed_line(
+        screen, YELLOW,
+        (cx+offsetRoad, 0),
+        (cx+offsetRoad, intersection.top - 20)
+    )
+
+    pygame.draw.line(
+        screen,
+        (255, 255, 255),
+        (cx+offsetRoad, intersection.top - 20),
+        (cx+offsetRoad - stoplineLength, intersection.top - 20) , 
+        2
+    )
+
+    draw_dashed_line_same_lane(
+        screen, WHITE,
+        (cx-offsetRoad, 0),
+        (cx-offsetRoad, intersection.top-20)
+    )
+
+    draw_dashed_line(
+        screen, YELLOW,
+        (cx-offsetRoad, intersection.bottom + 20),
+        (cx-offsetRoad, SCREEN_HEIGHT)
+    )
+
+    pygame.draw.line(
+        screen,
+        (255, 255, 255),
+        (cx-offsetRoad, intersection.bottom + 20),
+        (cx-offsetRoad + stoplineLength, intersection.bottom + 20), 
+        2
+    )
+
+    draw_dashed_line_same_lane(
+        screen, WHITE,
+        (cx+offsetRoad, intersection.bottom + 20),
+        (cx+offsetRoad, SCREEN_HEIGHT)
+    )
+
+    draw_dashed_line(
+        screen, YELLOW,
+        (0, cy-offsetRoad),
+        (intersection.left - 20, cy-offsetRoad)
+    )
+
+    pygame.draw.line(
+        screen,
+        (255, 255, 255),
+        (intersection.left - 20, cy-offsetRoad),
+        (intersection.left - 20, cy-offsetRoad + stoplineLength), 
+        2
+    )
+
+    draw_dashed_line_same_lane(
+        screen, WHITE,
+        (0, cy+offsetRoad),
+        (intersection.left - 20, cy+offsetRoad)
+    )
+
+    draw_dashed_line(
+        screen, YELLOW,
+        (intersection.right + 20, cy+offsetRoad),
+        (SCREEN_WIDTH, cy+offsetRoad)
+    )
+    pygame.draw.line(
+        screen,
+        (255, 255, 255),
+        (intersection.right + 20, cy+offsetRoad),
+        (intersection.right + 20, cy+offsetRoad - stoplineLength), 
+        2
+    )
+
+    draw_dashed_line_same_lane(
+        screen, WHITE,
+        (intersection.right + 20, cy-offsetRoad),
+        (SCREEN_WIDTH, cy-offsetRoad)
+    )
+
+
+
+
+def draw_dashed_line(screen, color, start, end, dash_length=20, gap=0, width=1):
+    x1, y1 = start
+    x2, y2 = end
+
+    length = ((x2 - x1)**2 + (y2 - y1)**2) ** 0.5
+    dx = (x2 - x1) / length
+    dy = (y2 - y1) / length
+
+    dist = 0
+    while dist < length:
+        dash_end = min(dist + dash_length, length)
+        sx = x1 + dx * dist
+        sy = y1 + dy * dist
+        ex = x1 + dx * dash_end
+        ey = y1 + dy * dash_end
+        pygame.draw.line(screen, color, (sx, sy), (ex, ey), width)
+        dist += dash_length + gap
+
+def draw_dashed_line_same_lane(screen, color, start, end, dash_length=20, gap=15, width=1):
+    x1, y1 = start
+    x2, y2 = end
+
+    length = ((x2 - x1)**2 + (y2 - y1)**2) ** 0.5
+    dx = (x2 - x1) / length
+    dy = (y2 - y1) / length
+
+    dist = 0
+    while dist < length:
+        dash_end = min(dist + dash_length, length)
+        sx = x1 + dx * dist
+        sy = y1 + dy * dist
+        ex = x1 + dx * dash_end
+        ey = y1 + dy * dash_end
+        pygame.draw.line(screen, color, (sx, sy), (ex, ey), width)
+        dist += dash_length + gap
+
+
+
+def draw_left_turn(screen, start: Vec2, end: Vec2, turn_type: str,
+                     width=LINE_WIDTH, color=(100, 220, 255)):
+    direction = end - start
+    direction.normalize_ip()
+
+    perp = pygame.Vector2(-direction.y, direction.x)
+    if turn_type == "right":
+        perp = -perp
+
+    # Control points for quadratic Bezier
+    ctrl1 = start + direction * 40 + perp * 30
+
+    steps = 30
+    for i in range(steps):
+        t = i / steps
+        t2 = 1 - t
+        pos = (t2 * t2 * start +
+               2 * t * t2 * ctrl1 +
+               t * t * end)
+        next_t = (i + 1) / steps
+        next_t2 = 1 - next_t
+        next_pos = (next_t2 * next_t2 * start +
+                    2 * next_t * next_t2 * ctrl1 +
+                    next_t * next_t * end)
+        pygame.draw.line(screen, BLUE, pos, next_pos, width)
+
+
+# def draw_arc(surface, center, radius, start_angle, stop_angle, color):
+#     x, y = int(center[0]), int(center[1])
+#     r = int(round(radius))
+
+#     start_angle = int(round(start_angle % 360))
+#     stop_angle  = int(round(stop_angle % 360))
+
+#     if start_angle == stop_angle:
+#         gfxdraw.circle(surface, x, y, r, color)
+#     else:
+#         gfxdraw.arc(surface, x, y, r, start_angle, stop_angle, color)
+
+
+def draw_arc(surface, center, radius, start_angle, stop_angle, color):
+    x, y = int(center[0]), int(center[1])
+    r = int(round(radius))
+
+    start_angle = int(round(start_angle)) % 360
+    stop_angle  = int(round(stop_angle)) % 360
+    if stop_angle < start_angle:
+        gfxdraw.arc(surface, x, y, r, start_angle, 359, color)
+        gfxdraw.arc(surface, x, y, r, 0, stop_angle, color)
+    elif stop_angle == start_angle:
+        gfxdraw.arc(surface, x, y, r, start_angle, (start_angle + 1) % 360, color)
+    else:
+        gfxdraw.arc(surface, x, y, r, start_angle, stop_angle, color)
+
+
+# def draw_right_turn(screen, color, start_pos, end_pos, radius, width=LINE_WIDTH):
+#     direction = get_right_turn_direction(start_pos, end_pos)
+
+#     if direction == "NW":
+#         center = pygame.Vector2(end_pos.x, start_pos.y)
+#         start_angle = 1.5 * math.pi 
+#         end_angle   = 0 
+
+#     elif direction == "EN":
+#         center = pygame.Vector2(start_pos.x, end_pos.y)
+#         start_angle = math.pi       
+#         end_angle   = 1.5 * math.pi  
+
+#     elif direction == "SE": 
+#         center = pygame.Vector2(end_pos.x, start_pos.y)
+#         start_angle = 0.5 * math.pi   
+#         end_angle   = math.pi 
+
+#     elif direction == "WS": 
+#         center = pygame.Vector2(start_pos.x, end_pos.y)
+#         start_angle = 0    
+#         end_angle   = 0.5 * math.pi  
+
+#     else:
+#         return
+
+#     rect = pygame.Rect(center.x - radius, center.y - radius, radius * 2, radius * 2)
+
+#     pygame.draw.arc(screen, color, rect, start_angle, end_angle, width)
+
+
+
+
+def draw_right_turn(screen, color, start_pos, end_pos, radius, width=LINE_WIDTH):
+    direction = get_right_turn_direction(start_pos, end_pos)
+
+    if direction == "NW":
+        center = pygame.Vector2(end_pos.x, start_pos.y)
+        start_angle = 0
+        end_angle   = 0.5 * math.pi
+
+    elif direction == "EN":
+        center = pygame.Vector2(start_pos.x, end_pos.y)
+        start_angle = 0.5 * math.pi
+        end_angle   = math.pi
+
+    elif direction == "SE":
+        center = pygame.Vector2(end_pos.x, start_pos.y)
+        start_angle = math.pi
+        end_angle   = 1.5 * math.pi
+
+    elif direction == "WS":
+        center = pygame.Vector2(start_pos.x, end_pos.y)
+        start_angle = 1.5 * math.pi
+        end_angle   = 0
+
+    else:
+        return
+
+    # Convert radians -> degrees for gfxdraw
+    start_deg = math.degrees(start_angle)
+    end_deg   = math.degrees(end_angle)
+
+    # # Draw "thick" arc by drawing multiple 1px arcs around the radius
+    # half = max(0, width // 2)
+    # for dr in range(-half, half + 1):
+    #     draw_arc(screen, center, radius + dr, start_deg, end_deg, color)
+    draw_arc(screen, center, radius, start_deg, end_deg, color)
+
+
+
+
+def get_right_turn_direction(start_pos, end_pos):
+    direction = ""
+    if end_pos.x > start_pos.x and end_pos.y > start_pos.y:
+        direction = "WS"
+    elif end_pos.x < start_pos.x and end_pos.y > start_pos.y:
+        direction = "NW"
+    elif end_pos.x > start_pos.x and end_pos.y < start_pos.y:
+        direction = "SE"
+    elif end_pos.x < start_pos.x and end_pos.y < start_pos.y:
+        direction = "EN"
+
+    return direction
+
+
+def draw_edges(screen, graph):
+    for edge_list in graph.adjacency.values():
+        for edge in edge_list:
+            start_pos = edge.start.get_pos()
+            end_pos = edge.end.get_pos()
+
+            if edge.edge_type == "left":
+                draw_left_turn(screen, start_pos, end_pos, edge.edge_type)
+            elif edge.edge_type == "right":
+                radius = abs(end_pos.x - start_pos.x)
+                draw_right_turn(screen, BLUE, start_pos, end_pos, radius, width=LINE_WIDTH)
+            else:
+                pygame.draw.line(
+                    screen,
+                    BLUE,
+                    (int(start_pos.x), int(start_pos.y)),
+                    (int(end_pos.x), int(end_pos.y)),
+                    LINE_WIDTH
+                )
+
+
+def draw_detection_zone(screen):
+    pygame.draw.circle(
+        screen,
+        RED,
+        (SCREEN_WIDTH//2, SCREEN_HEIGHT//2),
+        AMBULANCE_ZONE_RADIUS,
+        ZONE_WIDTH
+    )
+
+    pygame.draw.circle(
+        screen,
+        YELLOW,
+        (SCREEN_WIDTH//2, SCREEN_HEIGHT//2),
+        TRAFFIC_ZONE_RADIUS,
+        1
+    )
+
+def draw_background(screen, graph, font, show_lines):
+    """Draw the static scene. The window draws it once through a BackgroundCache."""
+    screen.fill(BG_COLOR)
+    draw_roads(screen)
+    if show_lines:
+        draw_edges(screen, graph)
+        draw_nodes(screen, font)
+        draw_detection_zone(screen)
+
+
+def draw_traffic(screen, traffic_lights, vehicles, ambulance_in_zone, show_lines):
+    """Draw lights, the active zone indicator and every vehicle. Returns the rects drawn."""
+    rects = RENDERER.draw_traffic_lights(screen, traffic_lights)
+
+    # Draw ambulance zone indicator if ambulance is present
+    if ambulance_in_zone and show_lines:
+        rects.append(pygame.draw.circle(
+            screen,
+            GREEN,
+            (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2),
+            AMBULANCE_ZONE_RADIUS,
+            ZONE_WIDTH
+        ))
+
+    # Sirens blink every 300 ms
+    siren_on = (pygame.time.get_ticks() // 300) % 2 == 0
+    rects.extend(RENDERER.draw_vehicles(screen, vehicles, siren_on))
+    return rects
+
+
+def build_simulation(scenario, engine_name="vehicle", data=None):
+    """Build the simulation of a scenario file (or of data, if given) on the window's layout."""
+    global NODE_POS
+    NODE_POS = build_node_positions()
+    return scenarios.build_simulation(scenario, engine_name, data, NODE_POS)
+
+
+def run_window(args):
+    """Open the window and run the interactive loop for the parsed main.py arguments."""
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    clock = pygame.time.Clock()
+    # Decode every sprite once so spawning vehicles never touches the disk
+    ASSETS.preload()
+    font = FONTS.get(None, 24)
+
+    # initial load
+    sim = build_simulation(args.scenario, args.engine)
+    graph = sim.graph
+    routes = sim.routes
+    traffic_lights = sim.traffic_lights
+    graph.debug_print()
+
+    paused = False
+    pause_font = FONTS.get(None, 36)
+    stats_panel = VehicleStatsPanel(STATS_REFRESH_FRAMES if args.stats_every is None else args.stats_every)
+
+    # Create UI buttons
+    button_width = 120
+    button_height = 40
+    button_margin = 10
+    button_y = SCREEN_HEIGHT - button_height - button_margin
+    
+    add_car_btn = Button(
+        button_margin, button_y, button_width, button_height,
+        "Add Car", (60, 60, 60), (100, 100, 100)
+    )
+    add_ambulance_btn = Button(
+        button_margin + button_width + button_margin, button_y, button_width + 20, button_height,
+        "Add Ambulance", (180, 60, 60), (220, 80, 80)
+    )
+
+    toggle_lines_btn = Button(
+        button_margin + 2* (button_margin + button_width + button_margin), button_y,
+        button_width + 20, button_height,
+        "Show Lines", (60, 120, 180), (80, 160, 220)
+    )
+    show_lines = True
+    # Static scene, redrawn only when the graph, window size or show_lines changes
+    background = BackgroundCache(
+        lambda surface, graph, show_lines: draw_background(surface, graph, font, show_lines)
+    )
+    # main.py turns timing on for --profile or --profile-out; P only toggles the
+    # overlay, and --profile-out alone records without showing it
+    show_profile = args.profile
+    # With --dirty-rects only the areas drawn this frame or the last reach the display
+    renderer = DirtyRectRenderer(screen) if args.dirty_rects else None
+    profile_font = FONTS.get(None, 18)
+
+    running = True
+    while running:
+        frame_started = time.perf_counter()
+        mouse_pos = pygame.mouse.get_pos()
+        add_car_btn.update(mouse_pos)
+        add_ambulance_btn.update(mouse_pos)
+
+        with PROFILER.phase("events"):
+            events = pygame.event.get()
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+
+            elif add_car_btn.is_clicked(event):
+                spawn_vehicle("car", sim)
+
+            elif add_ambulance_btn.is_clicked(event):
+                spawn_vehicle("ambulance", sim)
+
+            elif toggle_lines_btn.is_clicked(event):
+                show_lines = not show_lines
+                toggle_lines_btn.text = "Hide Lines" if show_lines else "Show Lines"
+
+
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+
+                elif event.key == pygame.K_r:
+                    paused = False
+                    sim.reset(*load_scenario(args.scenario, routes, traffic_lights))
+
+                elif event.key == pygame.K_p and PROFILER.enabled:
+                    show_profile = not show_profile
+                    if renderer is not None:
+                        renderer.invalidate()
+
+        with PROFILER.phase("draw_background"):
+            if renderer is None:
+                background.blit(screen, graph, show_lines)
+            else:
+                renderer.begin(background.get(graph, screen.get_size(), show_lines))
+        with PROFILER.phase("draw_vehicle_stats"):
+            drawn = stats_panel.draw(screen, sim.vehicles)
+
+        sim.step(advance=not paused)
+        sim.sync_views()
+        with PROFILER.phase("draw_traffic"):
+            drawn += draw_traffic(screen, traffic_lights, sim.vehicles, sim.ambulance_in_zone, show_lines)
+
+        if paused:
+            text = TEXT_CACHE.render(
+                pause_font,
+                "PAUSED (Space = resume, R = reset)",
+                (255, 255, 255)
+            )
+            drawn.append(screen.blit(text, (20, 20)))
+        else:
+            text = TEXT_CACHE.render(
+                pause_font,
+                "Press SPACE to pause, R to reset scenario",
+                (255, 255, 255)
+            )
+            drawn.append(screen.blit(text, (20, 20)))
+
+        # Draw UI buttons
+        drawn.append(add_car_btn.draw(screen))
+        drawn.append(add_ambulance_btn.draw(screen))
+        drawn.append(toggle_lines_btn.draw(screen))
+
+        if show_profile:
+            drawn.append(PROFILER.draw_overlay(screen, profile_font))
+
+        with PROFILER.phase("display_flip"):
+            if renderer is None:
+                pygame.display.flip()
+            else:
+                renderer.extend(drawn)
+                renderer.present()
+        if PROFILER.enabled:
+            # work time only, the frame cap wait below is not included
+            PROFILER.record("frame", time.perf_counter() - frame_started)
+        clock.tick(60)
+
+    if args.profile_out:
+        PROFILER.dump_json(args.profile_out)
+    pygame.quit()